@@ -0,0 +1,70 @@
+#!/bin/sh
+# Fixed, offline regtest workload run by the instrumented bitcoind to collect a
+# PGO profile: mine blocks, create and relay wallet transactions between two
+# nodes, then reindex the resulting chain.
+#
+# Usage: pgo-workload.sh BINDIR PROFILE_DIR [BLOCKS] [OUTPUTS]
+set -ex
+
+BINDIR=$1
+PROFILE_DIR=$2
+BLOCKS=${3:-200}
+OUTPUTS=${4:-20}
+WORKDIR=$(mktemp -d)
+
+mkdir -p "${PROFILE_DIR}"
+
+export LLVM_PROFILE_FILE="${PROFILE_DIR}/bitcoind-%p.profraw"
+
+cli() {
+  node=$1
+  shift
+  LLVM_PROFILE_FILE="${WORKDIR}/cli-%p.profraw" "${BINDIR}/bitcoin-cli" -regtest \
+    -datadir="${WORKDIR}/${node}" -rpcwait "$@"
+}
+
+# Options go in bitcoin.conf so that bitcoin-cli picks up each node's rpcport
+start() {
+  node=$1
+  shift
+  mkdir -p "${WORKDIR}/${node}"
+  printf '%s\n' "[regtest]" "$@" > "${WORKDIR}/${node}/bitcoin.conf"
+  "${BINDIR}/bitcoind" -regtest -datadir="${WORKDIR}/${node}" -printtoconsole=0 &
+}
+
+start miner bind=127.0.0.1:18444 rpcport=18443
+MINER_PID=$!
+start relay bind=127.0.0.1:18544 rpcport=18543 connect=127.0.0.1:18444
+RELAY_PID=$!
+
+cli miner createwallet pgo
+ADDRESS=$(cli miner getnewaddress)
+cli miner generatetoaddress 101 "${ADDRESS}"
+
+# One wallet transaction with OUTPUTS outputs per block, relayed to the second
+# node through its mempool before being mined
+AMOUNTS=""
+i=0
+while [ "$i" -lt "${OUTPUTS}" ]; do
+  AMOUNTS="${AMOUNTS:+${AMOUNTS}, }\"$(cli miner getnewaddress)\": 0.001"
+  i=$((i + 1))
+done
+
+i=0
+while [ "$i" -lt "${BLOCKS}" ]; do
+  cli miner -named sendmany amounts="{${AMOUNTS}}" fee_rate=1
+  cli miner generatetoaddress 1 "${ADDRESS}"
+  i=$((i + 1))
+done
+
+HEIGHT=$(cli miner getblockcount)
+cli relay waitforblockheight "${HEIGHT}" 60000
+[ "$(cli relay getblockcount)" = "${HEIGHT}" ]
+cli relay stop
+cli miner stop
+wait "${RELAY_PID}" "${MINER_PID}"
+
+"${BINDIR}/bitcoind" -regtest -datadir="${WORKDIR}/relay" -printtoconsole=0 \
+  -connect=0 -listen=0 -reindex -stopatheight="${HEIGHT}"
+
+rm -rf "${WORKDIR}"
@@ -3,70 +3,38 @@
 CI helper script for bitcoin-core-docker builds.
 
 Commands:
+    plan <--ref REF>         Output matrix, tags and push decision as one JSON document
+    bake <--ref REF>         Output a docker buildx bake definition for the matrix
+    record-published FILES   Record build digests of pushed matrix entries
+    record-durations FILES   Record build durations of matrix entries
+    image-report IMAGES      Measure image size, layers and cold-start time
+    benchmark IMAGES         Compare regtest -reindex time across images
+    pull-benchmark IMAGES    Compare pull and start time through a local registry
+    build-timings FILE       Attribute BuildKit rawjson build time to stages and steps
+    pin-verifier             Compare (and --write) the verifier image's pinned inputs
     matrix <--ref REF>       Output build matrix as JSON for GitHub Actions
     tags <--version V>       Output Docker tags for a version
     should-push <--ref REF>  Check if images should be pushed (true/false)
 """
 
 import argparse
+import base64
+import fnmatch
+import hashlib
+import heapq
 import json
+import os
 import re
+import statistics
+import subprocess
 import sys
+import time
+import urllib.request
+import zlib
+from datetime import datetime, timezone
 from pathlib import Path
 
-
-class Version:
-    """Parsed version with comparison support."""
-
-    def __init__(self, version_str: str):
-        self.original = version_str
-        self.major = 0
-        self.minor = 0
-        self.patch = 0
-        self.rc = None
-
-        match = re.match(r"^(\d+)\.(\d+)(?:\.(\d+))?(rc(\d+))?$", version_str)
-        if not match:
-            raise ValueError(f"Invalid version format: {version_str}")
-
-        self.major = int(match.group(1))
-        self.minor = int(match.group(2))
-        self.patch = int(match.group(3)) if match.group(3) else 0
-        self.rc = int(match.group(5)) if match.group(5) else None
-
-    def __str__(self):
-        return self.original
-
-    def __lt__(self, other):
-        self_tuple = (self.major, self.minor, self.patch)
-        other_tuple = (other.major, other.minor, other.patch)
-        if self_tuple != other_tuple:
-            return self_tuple < other_tuple
-        if self.rc is None and other.rc is None:
-            return False
-        if self.rc is None:
-            return False
-        if other.rc is None:
-            return True
-        return self.rc < other.rc
-
-    def __eq__(self, other):
-        return (
-            self.major == other.major
-            and self.minor == other.minor
-            and self.patch == other.patch
-            and self.rc == other.rc
-        )
-
-    def __le__(self, other):
-        return self < other or self == other
-
-    def __ge__(self, other):
-        return not self < other
-
-    @property
-    def is_rc(self):
-        return self.rc is not None
+from manifest import Manifest, Version, parse_version
 
 
 def get_repo_root() -> Path:
@@ -80,55 +48,89 @@ def get_repo_root() -> Path:
 
 def discover_versions(repo_root: Path) -> list[str]:
     """Find all top-level version directories (excluding deprecated, master, scripts)."""
-    exclude = {"deprecated", "master", "scripts", ".github"}
-    versions = []
-    for path in repo_root.iterdir():
-        if not path.is_dir():
-            continue
-        if path.name.startswith("."):
-            continue
-        if path.name in exclude:
-            continue
-        if (path / "Dockerfile").exists():
-            try:
-                Version(path.name)
-                versions.append(path.name)
-            except ValueError:
-                continue
-    return versions
+    manifest = Manifest.load(repo_root)
+    versions = manifest.versions()
+    return [v.original for v in versions if manifest.variant(v.original, "debian")]
 
 
 def discover_all_top_level(repo_root: Path) -> list[str]:
     """Find all top-level directories with Dockerfiles (including master)."""
-    exclude = {"deprecated", "scripts", ".github"}
-    dirs = []
-    for path in repo_root.iterdir():
-        if not path.is_dir():
-            continue
-        if path.name.startswith("."):
-            continue
-        if path.name in exclude:
-            continue
-        if (path / "Dockerfile").exists():
-            dirs.append(path.name)
-    return dirs
+    return Manifest.load(repo_root).active_dirs()
 
 
 def get_latest_version(repo_root: Path) -> Version | None:
     """Get the highest non-RC version."""
-    versions = []
-    for v_str in discover_versions(repo_root):
-        try:
-            v = Version(v_str)
-            if not v.is_rc:
-                versions.append(v)
-        except ValueError:
+    return Manifest.load(repo_root).latest
+
+
+DEFAULT_PUBLISHED = Path(".cache") / "published.json"
+
+# Paths that never affect the images built by build.yml.
+IGNORED_PATHS = (
+    "*.md",
+    "LICENSE",
+    ".gitignore",
+    "justfile",
+    "deprecated/*",
+    "scripts/releases.py",
+    "scripts/version_manager.py",
+    "scripts/test_*.py",
+    ".github/workflows/alpine-master.yml",
+    ".github/workflows/debian-master.yml",
+    ".github/workflows/dockerhub-description.yml",
+    ".github/workflows/record.yml",
+    ".github/workflows/verifier.yml",
+)
+
+
+def get_changed_contexts(repo_root: Path, base_ref: str) -> set[tuple] | None:
+    """Map files changed since base_ref to (directory, variant) build contexts.
+
+    A change under verifier/ maps to every context built from the repo's
+    current verifier image. Returns None when a shared file changed (or git
+    fails) and everything must be rebuilt.
+    """
+    try:
+        result = subprocess.run(
+            ["git", "diff", "--name-only", f"{base_ref}...HEAD"],
+            cwd=repo_root,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except (OSError, subprocess.CalledProcessError) as e:
+        print(f"Warning: git diff against {base_ref} failed: {e}", file=sys.stderr)
+        return None
+
+    manifest = Manifest.load(repo_root)
+    contexts = set()
+    for path in result.stdout.splitlines():
+        if any(fnmatch.fnmatch(path, pattern) for pattern in IGNORED_PATHS):
             continue
-    return max(versions) if versions else None
+        parts = path.split("/")
+        top = parts[0]
+        if top == "verifier":
+            contexts |= get_verifier_contexts(repo_root)
+        elif len(parts) > 1 and manifest.variants(top):
+            variant = parts[1] if parts[1] in manifest.variants(top) else "debian"
+            contexts.add((top, variant))
+        elif len(parts) > 1 and (top == "master" or parse_version(top)):
+            continue  # removed or deprecated version directory
+        else:
+            return None
+    return contexts
 
 
-def get_matrix(github_ref: str, repo_root: Path, version: str | None = None) -> dict:
-    """Generate build matrix based on GitHub ref or explicit version."""
+def get_matrix(
+    github_ref: str,
+    repo_root: Path,
+    version: str | None = None,
+    since: str | None = None,
+) -> dict:
+    """Generate build matrix based on GitHub ref or explicit version.
+
+    With `since`, branch builds only include contexts changed since that ref.
+    """
     if version:
         version_dir = repo_root / version
         if not version_dir.is_dir():
@@ -148,20 +150,152 @@ def get_matrix(github_ref: str, repo_root: Path, version: str | None = None) ->
     else:
         dirs = discover_all_top_level(repo_root)
 
+    changed = None
+    if since and not version and not github_ref.startswith("refs/tags/v"):
+        changed = get_changed_contexts(repo_root, since)
+
+    manifest = Manifest.load(repo_root)
     include = []
     for d in sorted(dirs):
         include.append({"version": d, "variant": "debian"})
-        alpine_dir = repo_root / d / "alpine"
-        if alpine_dir.is_dir() and (alpine_dir / "Dockerfile").exists():
-            include.append({"version": d, "variant": "alpine"})
+        for variant in manifest.variants(d):
+            if variant != "debian":
+                include.append({"version": d, "variant": variant})
+
+    if changed is not None:
+        include = [e for e in include if (e["version"], e["variant"]) in changed]
+
+    return {"include": include}
+
+
+# Optimized Alpine builds of the latest release, published with suffixed tags
+# (e.g. 31.0-alpine-lto). `ci.py benchmark` compares them with plain alpine.
+ALPINE_FLAVORS = {
+    "lto": {"build_args": {"LTO": "thin"}, "platforms": None},
+    "lto-x86-64-v3": {
+        "build_args": {"LTO": "thin", "MARCH": "x86-64-v3"},
+        "platforms": ["linux/amd64"],
+    },
+    "lto-armv8.2-a": {
+        "build_args": {"LTO": "thin", "MARCH": "armv8.2-a"},
+        "platforms": ["linux/arm64"],
+    },
+    # The PGO workload runs the instrumented build, so only natively built
+    # platforms qualify
+    "lto-pgo": {
+        "build_args": {"LTO": "thin", "PGO": "on"},
+        "platforms": ["linux/amd64", "linux/arm64"],
+    },
+    # Dependencies from Bitcoin Core's depends/ instead of Alpine's packages
+    "depends": {"build_args": {"DEPENDS": "on"}, "platforms": None},
+}
+
+# Debian images that keep only some release binaries (ARG COMPONENTS), built
+# for every release and published with suffixed tags (e.g. 31.0-daemon).
+COMPONENT_FLAVORS = {
+    "daemon": {"build_args": {"COMPONENTS": "bitcoind"}, "platforms": None},
+    "cli": {
+        "build_args": {"COMPONENTS": "bitcoin-cli", "DEFAULT_CMD": "bitcoin-cli"},
+        "platforms": None,
+    },
+}
+
+
+# Extra layer compressions pushed next to the default gzip image, tagged with
+# a -<compression> suffix. estargz stays gzip-compatible but can be pulled
+# lazily by containerd's stargz snapshotter.
+LAYER_COMPRESSIONS = {
+    "zstd": "compression=zstd,compression-level=3,force-compression=true,"
+    "oci-mediatypes=true",
+    "estargz": "compression=estargz,force-compression=true,oci-mediatypes=true",
+}
+
+
+def get_compressions(tags: list[str], compressions: list[str]) -> list[dict]:
+    """buildx output settings and suffixed tags for each extra compression."""
+    return [
+        {
+            "compression": compression,
+            "output": LAYER_COMPRESSIONS[compression],
+            "tags": [f"{tag}-{compression}" for tag in tags],
+        }
+        for compression in compressions
+    ]
 
+
+def get_entry_name(entry: dict) -> str:
+    """Unique name of a matrix entry, e.g. 30.2-alpine or 31.0-alpine-lto."""
+    name = f"{entry['version']}-{entry['variant']}"
+    if entry.get("flavor"):
+        name += f"-{entry['flavor']}"
+    return name
+
+
+def get_published_key(entry: dict) -> str:
+    """Key of a matrix entry in the published digest record."""
+    key = f"{entry['version']}/{entry['variant']}"
+    if entry.get("flavor"):
+        key += f"/{entry['flavor']}"
+    return key
+
+
+def get_flavors(entry: dict, latest: Version | None) -> dict:
+    """Flavors of a matrix entry: components of a release, or optimized alpine."""
+    if entry["variant"] == "debian" and parse_version(entry["version"]):
+        return COMPONENT_FLAVORS
+    if entry["variant"] == "alpine" and latest and entry["version"] == latest.original:
+        return ALPINE_FLAVORS
+    return {}
+
+
+def add_flavors(matrix: dict, latest: Version | None) -> dict:
+    """Add an entry per flavor after each entry that has flavors."""
+    include = []
+    for entry in matrix["include"]:
+        include.append(entry)
+        for flavor in get_flavors(entry, latest):
+            include.append({**entry, "flavor": flavor})
     return {"include": include}
 
 
-def generate_tags(version_str: str, alpine: bool, repo_root: Path) -> list[str]:
+def get_build_path(version_str: str, variant: str) -> str:
+    """Get the docker build context for a matrix entry."""
+    if variant != "debian":
+        return f"{version_str}/{variant}"
+    return version_str
+
+
+# First release whose alpine Dockerfile cross-compiles from BUILDPLATFORM.
+ALPINE_CROSS_VERSION = Version("29.0")
+
+# The static variant builds depends natively on each target platform, so it
+# is limited to the platforms with native runners.
+STATIC_PLATFORMS = ["linux/amd64", "linux/arm64"]
+
+
+def get_platforms(version_str: str, variant: str) -> list[str]:
+    """Get the target platforms for a matrix entry."""
+    if version_str == "master":
+        return ["linux/amd64"]
+    if variant == "static":
+        return STATIC_PLATFORMS
+    if variant == "alpine":
+        version = parse_version(version_str)
+        if not version or version < ALPINE_CROSS_VERSION:
+            return ["linux/amd64"]
+    return ["linux/amd64", "linux/arm64", "linux/arm/v7"]
+
+
+def generate_tags(
+    version_str: str,
+    alpine: bool,
+    repo_root: Path,
+    latest: Version | None = None,
+) -> list[str]:
     """Generate Docker tags for a version.
 
-    Preserves the tag logic from the original build.yml.
+    Preserves the tag logic from the original build.yml. Pass `latest` to
+    avoid rescanning the repo when generating tags for many versions.
     """
     repo = "bitcoin/bitcoin"
     tags = []
@@ -184,7 +318,8 @@ def generate_tags(version_str: str, alpine: bool, repo_root: Path) -> list[str]:
     rc = v.rc
     is_rc = v.is_rc
 
-    latest = get_latest_version(repo_root)
+    if latest is None:
+        latest = get_latest_version(repo_root)
 
     if not alpine:
         if is_rc:
@@ -226,6 +361,15 @@ def generate_tags(version_str: str, alpine: bool, repo_root: Path) -> list[str]:
     return tags
 
 
+def get_variant_tags(debian_tags: list[str], variant: str) -> list[str]:
+    """Suffix Debian tags for another variant, e.g. 31.0-static and static."""
+    tags = []
+    for tag in debian_tags:
+        repo, name = tag.rsplit(":", 1)
+        tags.append(f"{repo}:{variant}" if name == "latest" else f"{tag}-{variant}")
+    return tags
+
+
 def should_push(github_ref: str, version: str | None = None) -> bool:
     """Determine if images should be pushed."""
     if version:
@@ -236,10 +380,1076 @@ def should_push(github_ref: str, version: str | None = None) -> bool:
     return tag_version != "master"
 
 
+# GitHub runner per target platform. GitHub's arm64 runners cannot execute
+# 32-bit ARM, so linux/arm/v7 still builds under QEMU on an amd64 runner.
+RUNNERS = {
+    "linux/amd64": ("ubuntu-24.04", False),
+    "linux/arm64": ("ubuntu-24.04-arm", False),
+    "linux/arm/v7": ("ubuntu-24.04", True),
+}
+DEFAULT_RUNNER = ("ubuntu-latest", True)
+
+
+def split_platforms(entry: dict) -> list[dict]:
+    """Expand a multi-platform entry into one entry per platform and runner."""
+    split = []
+    for platform in entry["platforms"].split(","):
+        runner, qemu = RUNNERS.get(platform, DEFAULT_RUNNER)
+        split.append(
+            {
+                **entry,
+                "platforms": platform,
+                "platform_pair": platform.replace("/", "-"),
+                "runner": runner,
+                "qemu": qemu,
+            }
+        )
+    return split
+
+
+DEFAULT_CACHE_REPO = "bitcoin/bitcoin-buildcache"
+DEFAULT_CACHE_DIR = Path(".cache") / "buildx"
+
+
+def get_cache_fallbacks(repo_root: Path, version_str: str) -> list[str]:
+    """Versions whose build cache can seed a build, most specific first.
+
+    The version itself, then other active versions of the same major (newest
+    first), then the closest lower active version.
+    """
+    try:
+        version = Version(version_str)
+    except ValueError:
+        return [version_str]
+    versions = Manifest.load(repo_root).versions()
+    chain = [version_str]
+    for v in sorted(versions, reverse=True):
+        if v.major == version.major and v.original not in chain:
+            chain.append(v.original)
+    lower = [v for v in versions if v < version]
+    if lower and max(lower).original not in chain:
+        chain.append(max(lower).original)
+    return chain
+
+
+def get_cache_settings(
+    repo_root: Path, entry: dict, backend: str, location: str | None
+) -> tuple[list[str], str]:
+    """buildx --cache-from refs and --cache-to ref for a matrix entry.
+
+    Scopes are keyed on version, variant, flavor and (for split entries)
+    platform. Registry caches are only written by pushing builds, which are
+    logged in.
+    """
+    suffix = entry["variant"]
+    if entry.get("flavor"):
+        suffix += f"-{entry['flavor']}"
+    if "platform_pair" in entry:
+        suffix += f"-{entry['platform_pair']}"
+
+    def ref(version_str):
+        scope = f"{version_str}-{suffix}"
+        if backend == "registry":
+            return f"type=registry,ref={location or DEFAULT_CACHE_REPO}:{scope}"
+        return f"type=local,src={location or DEFAULT_CACHE_DIR}/{scope}"
+
+    cache_from = [ref(v) for v in get_cache_fallbacks(repo_root, entry["version"])]
+    if backend == "registry":
+        cache_to = f"{cache_from[0]},mode=max" if entry["push"] else ""
+    else:
+        scope = f"{entry['version']}-{suffix}"
+        cache_to = f"type=local,dest={location or DEFAULT_CACHE_DIR}/{scope},mode=max"
+    return cache_from, cache_to
+
+
+SIGS_REPO = "bitcoin-core/guix.sigs"
+
+
+def get_sigs_ref(repo: str = SIGS_REPO) -> str:
+    """The latest guix.sigs commit that touched builder-keys/.
+
+    Only `pin-verifier` looks it up, to propose a new SIGS_REF for review;
+    builds always use the commit pinned in verifier/Dockerfile. Attestation-only
+    commits, which make up most of guix.sigs, do not change it.
+    """
+    url = f"https://api.github.com/repos/{repo}/commits?path=builder-keys&per_page=1"
+    headers = {"Accept": "application/vnd.github+json"}
+    if os.environ.get("GITHUB_TOKEN"):
+        headers["Authorization"] = f"Bearer {os.environ['GITHUB_TOKEN']}"
+    request = urllib.request.Request(url, headers=headers)
+    with urllib.request.urlopen(request, timeout=30) as response:
+        return json.load(response)[0]["sha"]
+
+
+VERIFIER_REPO = "bitcoin/bitcoin-verifier"
+VERIFIER_PLATFORMS = ["linux/amd64", "linux/arm64"]
+
+
+def get_verifier_image(repo_root: Path) -> str | None:
+    """Tag of the verifier image defined by verifier/Dockerfile."""
+    dockerfile = repo_root / "verifier" / "Dockerfile"
+    if not dockerfile.exists():
+        return None
+    match = re.search(r"^ENV VERIFIER_VERSION=(\S+)$", dockerfile.read_text(), re.M)
+    return f"{VERIFIER_REPO}:{match.group(1)}" if match else None
+
+
+def get_dockerfile_verifier(dockerfile: Path) -> str | None:
+    """The default VERIFIER_IMAGE a release Dockerfile builds from."""
+    if not dockerfile.exists():
+        return None
+    match = re.search(r"^ARG VERIFIER_IMAGE=(\S+)$", dockerfile.read_text(), re.M)
+    return match.group(1) if match else None
+
+
+VERIFIER_BASE = "debian:bookworm-slim"
+
+
+def get_debian_digest(image: str = VERIFIER_BASE) -> str:
+    """Registry digest of the verifier's base image tag."""
+    output = docker("buildx", "imagetools", "inspect", image)
+    match = re.search(r"^Digest:\s+(sha256:[0-9a-f]{64})$", output, re.M)
+    if not match:
+        raise ValueError(f"no digest in imagetools output for {image}")
+    return match.group(1)
+
+
+def get_debian_snapshot() -> str:
+    """Today's snapshot.debian.org timestamp."""
+    return datetime.now(timezone.utc).strftime("%Y%m%dT000000Z")
+
+
+# Pinned verifier/Dockerfile ARGs and how to look up their latest value. The
+# package snapshot is only moved along with the base image.
+VERIFIER_PINS = {
+    "DEBIAN_DIGEST": get_debian_digest,
+    "DEBIAN_SNAPSHOT": get_debian_snapshot,
+    "SIGS_REF": get_sigs_ref,
+}
+
+
+def get_verifier_pins(repo_root: Path) -> dict:
+    """Current values of the VERIFIER_PINS ARGs in verifier/Dockerfile."""
+    text = (repo_root / "verifier" / "Dockerfile").read_text()
+    pins = {}
+    for name in VERIFIER_PINS:
+        match = re.search(rf"^ARG {name}=(\S*)$", text, re.M)
+        pins[name] = match.group(1) if match else None
+    return pins
+
+
+def write_verifier_pins(repo_root: Path, pins: dict) -> str:
+    """Pin new values in verifier/Dockerfile under a new VERIFIER_VERSION.
+
+    Release Dockerfiles built from the old verifier tag move to the new one,
+    so published tags never change their contents. Returns the new tag.
+    """
+    old_image = get_verifier_image(repo_root)
+    dockerfile = repo_root / "verifier" / "Dockerfile"
+    text = dockerfile.read_text()
+    for name, value in pins.items():
+        text = re.sub(rf"^ARG {name}=\S*$", f"ARG {name}={value}", text, flags=re.M)
+    version = int(re.search(r"^ENV VERIFIER_VERSION=(\d+)$", text, re.M).group(1))
+    text = re.sub(
+        r"^ENV VERIFIER_VERSION=\d+$",
+        f"ENV VERIFIER_VERSION={version + 1}",
+        text,
+        flags=re.M,
+    )
+    dockerfile.write_text(text)
+    new_image = get_verifier_image(repo_root)
+
+    manifest = Manifest.load(repo_root, use_cache=False)
+    for name in manifest.active_dirs():
+        for variant in manifest.variants(name):
+            path = repo_root / manifest.variant(name, variant)["dockerfile"]
+            if get_dockerfile_verifier(path) == old_image:
+                path.write_text(
+                    path.read_text().replace(
+                        f"ARG VERIFIER_IMAGE={old_image}\n",
+                        f"ARG VERIFIER_IMAGE={new_image}\n",
+                    )
+                )
+    return new_image
+
+
+def get_verifier_contexts(repo_root: Path) -> set[tuple]:
+    """(directory, variant) contexts built from the repo's verifier image."""
+    verifier = get_verifier_image(repo_root)
+    manifest = Manifest.load(repo_root)
+    contexts = set()
+    for name in manifest.active_dirs():
+        for variant in manifest.variants(name):
+            dockerfile = repo_root / manifest.variant(name, variant)["dockerfile"]
+            if verifier and get_dockerfile_verifier(dockerfile) == verifier:
+                contexts.add((name, variant))
+    return contexts
+
+
+def get_build_digest(repo_root: Path, entry: dict) -> str:
+    """Canonical digest of a matrix entry's build context, platforms and build args."""
+    context = Manifest.load(repo_root).variant(entry["version"], entry["variant"])
+    payload = {
+        "context": context["digest"] if context else None,
+        "platforms": entry["platforms"],
+        "build_args": entry.get("build_args", {}),
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+
+def load_published(path: Path) -> dict:
+    """Load the record of previously published build digests."""
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text())
+
+
+def get_build_action(entry: dict, published: dict) -> tuple[str, str | None]:
+    """Decide whether an entry needs a build, a retag or nothing.
+
+    Returns (action, retag_from). An entry whose digest was already pushed is
+    skipped if all its tags exist, or retagged from an existing tag otherwise.
+    """
+    record = published.get(get_published_key(entry))
+    if not record or record["digest"] != entry["digest"]:
+        return "build", None
+    if set(entry["tags"]) <= set(record["tags"]):
+        return "skip", None
+    return "retag", record["tags"][0]
+
+
+def get_plan(
+    github_ref: str,
+    repo_root: Path,
+    version: str | None = None,
+    since: str | None = None,
+    published: dict | None = None,
+    split: bool = False,
+    cache_backend: str = "none",
+    cache_location: str | None = None,
+    flavors: bool = False,
+    compressions: list[str] | None = None,
+) -> dict:
+    """Generate the full build plan: matrix entries with tags, platforms and push.
+
+    With `published`, pushing entries whose digest is already published are
+    marked as skip or retag instead of build.
+
+    With `split`, entries to build are expanded into one job per platform on
+    a native runner where possible, and a `merge` matrix lists the entries
+    whose per-platform digests must be combined into a manifest list, with
+    the digest artifact each of their platform jobs uploads.
+
+    With a `cache_backend` (registry or local), entries to build carry
+    `cache_from` / `cache_to` settings for buildx.
+
+    With `flavors`, each release's debian entry is followed by one entry per
+    COMPONENT_FLAVORS flavor, and the latest release's alpine entry by one
+    per ALPINE_FLAVORS flavor, each with its build args and suffixed tags.
+
+    With `compressions`, every entry lists the buildx output settings and
+    tags of its LAYER_COMPRESSIONS images, and split plans merge those too.
+
+    Entries whose Dockerfile builds from the repo's verifier image name it in
+    `verifier`, so that non-pushing builds can build verifier/ themselves and
+    pass it as a named context before the image is published.
+    """
+    matrix = get_matrix(github_ref, repo_root, version, since)
+    push = should_push(github_ref, version)
+    latest = get_latest_version(repo_root)
+    verifier = get_verifier_image(repo_root)
+    if flavors:
+        matrix = add_flavors(matrix, latest)
+
+    for entry in matrix["include"]:
+        alpine = entry["variant"] == "alpine"
+        entry["name"] = get_entry_name(entry)
+        entry["build_path"] = get_build_path(entry["version"], entry["variant"])
+        entry["platforms"] = ",".join(get_platforms(entry["version"], entry["variant"]))
+        entry["tags"] = generate_tags(entry["version"], alpine, repo_root, latest)
+        if entry["variant"] not in ("debian", "alpine"):
+            entry["tags"] = get_variant_tags(entry["tags"], entry["variant"])
+        if entry.get("flavor"):
+            flavor = get_flavors(entry, latest)[entry["flavor"]]
+            if flavor["platforms"]:
+                entry["platforms"] = ",".join(flavor["platforms"])
+            if alpine:
+                entry["tags"] = [f"{tag}-{entry['flavor']}" for tag in entry["tags"]]
+            else:
+                entry["tags"] = get_variant_tags(entry["tags"], entry["flavor"])
+            entry["build_args"] = entry.get("build_args", {}) | flavor["build_args"]
+        if compressions:
+            entry["compressions"] = get_compressions(entry["tags"], compressions)
+        dockerfile = repo_root / entry["build_path"] / "Dockerfile"
+        if verifier and get_dockerfile_verifier(dockerfile) == verifier:
+            entry["verifier"] = verifier
+        entry["push"] = push
+        entry["digest"] = get_build_digest(repo_root, entry)
+        entry["action"] = "build"
+        if push and published is not None:
+            entry["action"], retag_from = get_build_action(entry, published)
+            if retag_from:
+                entry["retag_from"] = retag_from
+
+    plan = {"push": push, "matrix": matrix}
+    if split:
+        include = []
+        merge = []
+        for entry in matrix["include"]:
+            if entry["action"] != "build":
+                runner, _ = DEFAULT_RUNNER
+                include.append({**entry, "runner": runner, "qemu": False})
+                continue
+            platforms = split_platforms(entry)
+            include.extend(platforms)
+            pairs = [p["platform_pair"] for p in platforms]
+            merge.append(
+                {
+                    **entry,
+                    "digests": f"digests-{entry['name']}-linux-*",
+                    "artifacts": [f"digests-{entry['name']}-{p}" for p in pairs],
+                }
+            )
+            for compressed in entry.get("compressions", []):
+                prefix = f"digests-compressed-{entry['name']}"
+                merge.append(
+                    {
+                        **{k: v for k, v in entry.items() if k != "compressions"},
+                        "compression": compressed["compression"],
+                        "tags": compressed["tags"],
+                        "digests": f"{prefix}-linux-*",
+                        "artifacts": [f"{prefix}-{p}" for p in pairs],
+                    }
+                )
+        plan["matrix"] = {"include": include}
+        plan["merge"] = {"include": merge}
+
+    if cache_backend != "none":
+        for entry in plan["matrix"]["include"]:
+            if entry["action"] == "build":
+                entry["cache_from"], entry["cache_to"] = get_cache_settings(
+                    repo_root, entry, cache_backend, cache_location
+                )
+
+    return plan
+
+
+def record_published(path: Path, entries: list[dict]):
+    """Merge pushed matrix entries into the published digest record."""
+    published = load_published(path)
+    for entry in entries:
+        if not entry.get("push") or entry.get("action") == "skip":
+            continue
+        if entry.get("compression"):
+            continue  # recompressed copy of an entry recorded on its own
+        published[get_published_key(entry)] = {
+            "digest": entry["digest"],
+            "tags": entry["tags"],
+        }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(published, indent=2, sort_keys=True) + "\n")
+
+
+DEFAULT_DURATIONS = Path(".cache") / "durations.json"
+DURATION_HISTORY = 10
+
+# Estimated build seconds for targets without history: Alpine compiles from
+# source (static also builds depends), Debian only repackages release binaries;
+# QEMU slows down the targets that compile under emulation.
+DEFAULT_ESTIMATES = {"alpine": 2400, "debian": 300, "static": 3600}
+QEMU_FACTOR = 4
+
+
+def get_target_key(entry: dict) -> str:
+    """Duration history key for a matrix entry."""
+    key = get_entry_name(entry)
+    if "platform_pair" in entry:
+        key += f"-{entry['platform_pair']}"
+    return key
+
+
+def load_durations(path: Path) -> dict:
+    """Load recorded build durations ({target: [seconds, ...]})."""
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text())
+
+
+def compiles_under_emulation(entry: dict) -> bool:
+    """Whether a matrix entry runs its compiler under QEMU.
+
+    Debian entries only fetch release binaries, and Alpine entries from
+    ALPINE_CROSS_VERSION cross-compile with xx on the build platform, so
+    only the remaining Alpine and static entries on a foreign platform do.
+    """
+    if entry["variant"] == "debian":
+        return False
+    if entry["variant"] == "alpine":
+        version = parse_version(entry["version"])
+        if version and version >= ALPINE_CROSS_VERSION:
+            return False
+    if "runner" in entry:
+        return bool(entry.get("qemu"))
+    return any(p != "linux/amd64" for p in entry["platforms"].split(","))
+
+
+def estimate_duration(entry: dict, durations: dict) -> float:
+    """Median of recorded durations, or a default by variant and emulation."""
+    history = durations.get(get_target_key(entry))
+    if history:
+        return statistics.median(history)
+    estimate = DEFAULT_ESTIMATES.get(entry["variant"], DEFAULT_ESTIMATES["debian"])
+    if compiles_under_emulation(entry):
+        estimate *= QEMU_FACTOR
+    return estimate
+
+
+def balance_plan(plan: dict, durations: dict, slots: int = 0) -> dict:
+    """Order the matrix longest-first and optionally pack it into runner slots.
+
+    Longest-processing-time-first: GitHub starts matrix jobs in order, so the
+    slowest targets start first. With `slots`, the plan also reports how the
+    entries would pack into that many runners and the resulting critical
+    path; this is informational, the matrix itself is not assigned to slots.
+    """
+    entries = plan["matrix"]["include"]
+    for entry in entries:
+        entry["target"] = get_target_key(entry)
+        entry["estimated_seconds"] = round(estimate_duration(entry, durations))
+    entries.sort(key=lambda e: e["estimated_seconds"], reverse=True)
+
+    if slots > 0:
+        loads = [(0, slot) for slot in range(slots)]
+        heapq.heapify(loads)
+        assigned = [[] for _ in range(slots)]
+        for entry in entries:
+            load, slot = heapq.heappop(loads)
+            assigned[slot].append(entry["target"])
+            heapq.heappush(loads, (load + entry["estimated_seconds"], slot))
+        plan["slots"] = [
+            {"slot": slot, "estimated_seconds": load, "targets": assigned[slot]}
+            for load, slot in sorted(loads, key=lambda x: x[1])
+        ]
+        plan["critical_path_seconds"] = max(load for load, _ in loads)
+    return plan
+
+
+def record_durations(path: Path, samples: list[dict]):
+    """Append {target, seconds} samples to the duration history."""
+    durations = load_durations(path)
+    for sample in samples:
+        history = durations.setdefault(sample["target"], [])
+        history.append(round(float(sample["seconds"]), 1))
+        del history[:-DURATION_HISTORY]
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(durations, indent=2, sort_keys=True) + "\n")
+
+
+DEFAULT_IMAGE_REPORT = Path(".cache") / "image-report.json"
+
+
+def docker(*args: str) -> str:
+    """Run a docker command and return its stdout."""
+    result = subprocess.run(["docker", *args], capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"docker {args[0]} failed: {result.stderr.strip()}")
+    return result.stdout
+
+
+def get_compressed_size(image: str) -> int:
+    """Estimate the pull size of a local image by gzipping `docker save`."""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    size = 0
+    with subprocess.Popen(["docker", "save", image], stdout=subprocess.PIPE) as proc:
+        while chunk := proc.stdout.read(1 << 20):
+            size += len(compressor.compress(chunk))
+    if proc.returncode != 0:
+        raise RuntimeError(f"docker save {image} failed")
+    return size + len(compressor.flush())
+
+
+def get_version_command(image: str) -> list[str]:
+    """`-version` of a local image's default binary.
+
+    Images without bitcoind (COMPONENTS=bitcoin-cli) default to bitcoin-cli,
+    so the image's CMD names the binary to time.
+    """
+    info = json.loads(docker("image", "inspect", image))[0]
+    cmd = info["Config"].get("Cmd") or ["bitcoind"]
+    return [cmd[0], "-version"]
+
+
+def measure_image(image: str, runs: int) -> dict:
+    """Size, layer count and `-version` start time of a local image."""
+    info = json.loads(docker("image", "inspect", image))[0]
+    command = get_version_command(image)
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        docker("run", "--rm", image, *command)
+        timings.append(time.perf_counter() - start)
+    return {
+        "id": info["Id"],
+        "timestamp": int(time.time()),
+        "size": info["Size"],
+        "compressed_size": get_compressed_size(image),
+        "layers": len(info["RootFS"]["Layers"]),
+        "start_command": command[0],
+        "start_seconds": round(statistics.median(timings), 3),
+        "start_min_seconds": round(min(timings), 3),
+    }
+
+
+def get_regressions(
+    previous: dict, current: dict, max_size_increase: float, max_start_increase: float
+) -> list[str]:
+    """Describe metrics that grew by more than the allowed percentage."""
+    limits = {
+        "size": max_size_increase,
+        "compressed_size": max_size_increase,
+        "start_seconds": max_start_increase,
+    }
+    # Start times of different binaries are not comparable
+    if previous.get("start_command", "bitcoind") != current["start_command"]:
+        del limits["start_seconds"]
+    regressions = []
+    for metric, limit in limits.items():
+        before, after = previous[metric], current[metric]
+        if before and (after - before) / before * 100 > limit:
+            regressions.append(f"{metric} {before} -> {after} (limit +{limit}%)")
+    return regressions
+
+
+BENCH_DATADIR = "/home/bitcoin/.bitcoin"
+
+
+def run_benchmark(image: str, blocks: int, outputs: int, runs: int) -> dict:
+    """Time `bitcoind -reindex` of a regtest chain built inside `image`.
+
+    The chain is mined with one wallet transaction paying `outputs` outputs
+    per block, so reindexing exercises script and signature validation.
+    bitcoind is named explicitly, so images without an entrypoint script
+    (such as the static variant) work too.
+    """
+    name = f"bitcoin-bench-{os.getpid()}"
+    mount = f"{name}:{BENCH_DATADIR}"
+    docker("volume", "create", name)
+    try:
+        docker("run", "-d", "--name", name, "-v", mount, image, "bitcoind", "-regtest")
+
+        def cli(*args: str) -> str:
+            command = ["bitcoin-cli", "-regtest", "-rpcwait", *args]
+            return docker("exec", "-u", "bitcoin", name, *command).strip()
+
+        cli("createwallet", "bench")
+        address = cli("getnewaddress")
+        cli("generatetoaddress", "101", address)
+        for _ in range(blocks):
+            amounts = {cli("getnewaddress"): 0.001 for _ in range(outputs)}
+            cli("-named", "sendmany", f"amounts={json.dumps(amounts)}", "fee_rate=1")
+            cli("generatetoaddress", "1", address)
+        height = int(cli("getblockcount"))
+        cli("stop")
+        docker("wait", name)
+        docker("rm", name)
+
+        timings = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            docker(
+                "run", "--rm", "-v", mount, image,
+                "bitcoind", "-regtest", "-reindex", f"-stopatheight={height}",
+            )
+            timings.append(time.perf_counter() - start)
+    finally:
+        subprocess.run(["docker", "rm", "-f", name], capture_output=True)
+        subprocess.run(["docker", "volume", "rm", name], capture_output=True)
+    return {
+        "height": height,
+        "reindex_seconds": round(statistics.median(timings), 3),
+        "reindex_min_seconds": round(min(timings), 3),
+    }
+
+
+PULL_REGISTRY_IMAGE = "registry:2"
+
+
+def get_local_reference(image: str, port: int) -> str:
+    """Name of `image` in the local registry, without its own registry host."""
+    first, _, rest = image.partition("/")
+    if rest and ("." in first or ":" in first or first == "localhost"):
+        image = rest
+    return f"localhost:{port}/{image}"
+
+
+def wait_for_registry(port: int, timeout: float = 30):
+    """Wait until the local registry answers its /v2/ endpoint."""
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/v2/", timeout=5):
+                return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"registry on port {port} did not start")
+            time.sleep(0.5)
+
+
+def run_pull_benchmark(images: list[str], runs: int, port: int) -> list[dict]:
+    """Time `docker pull` and `-version` start of images via a local registry.
+
+    Each image is copied unchanged (same layer compression) into a throwaway
+    registry, so pull times reflect download and unpacking of the layers
+    rather than the remote registry's network path.
+    """
+    name = f"bitcoin-pull-bench-{os.getpid()}"
+    docker(
+        "run", "-d", "--rm", "--name", name,
+        "-p", f"127.0.0.1:{port}:5000", PULL_REGISTRY_IMAGE,
+    )
+    results = []
+    try:
+        wait_for_registry(port)
+        for image in images:
+            local = get_local_reference(image, port)
+            remove = ["docker", "image", "rm", "-f", local]
+            docker("buildx", "imagetools", "create", "--tag", local, image)
+            pulls, starts = [], []
+            command = None
+            for _ in range(runs):
+                subprocess.run(remove, capture_output=True)
+                start = time.perf_counter()
+                docker("pull", "--quiet", local)
+                pulls.append(time.perf_counter() - start)
+                command = command or get_version_command(local)
+                start = time.perf_counter()
+                docker("run", "--rm", local, *command)
+                starts.append(time.perf_counter() - start)
+            subprocess.run(remove, capture_output=True)
+            results.append(
+                {
+                    "image": image,
+                    "start_command": command[0],
+                    "pull_seconds": round(statistics.median(pulls), 3),
+                    "start_seconds": round(statistics.median(starts), 3),
+                }
+            )
+    finally:
+        subprocess.run(["docker", "rm", "-f", name], capture_output=True)
+    return results
+
+
+DEFAULT_TIMINGS_DIR = Path(".cache") / "build-timings"
+TIMINGS_HISTORY = 10
+
+# Step categories, matched in order against RUN commands and `set -x` traces.
+STEP_CATEGORIES = (
+    ("apt", r"\bapt-get\b|\bapk\b"),
+    ("git clone", r"\bgit (clone|fetch|checkout|sparse-checkout)\b"),
+    ("gpg import", r"\bgpg\b"),
+    ("verify", r"verify\.py"),
+    ("download", r"\b(curl|wget)\b"),
+    ("tar", r"\btar\b"),
+    ("install", r"cmake --install|make( -\S+)* install"),
+    ("cmake compile", r"cmake --build|\bmake\b"),
+    ("cmake configure", r"\bcmake\b"),
+    ("strip", r"\bstrip\b"),
+)
+# e.g. "[build 4/7] RUN ..." or, in multi-platform builds,
+# "[linux/arm/v7 build 4/7] RUN ..."
+VERTEX_NAME = re.compile(
+    r"^\[(?:(?P<platform>[\w-]+/[\w/.-]+) )?(?:(?P<stage>[\w.-]+) )?\d+/\d+\] "
+    r"(?P<command>.*)$"
+)
+
+
+def parse_buildkit_time(value: str | None) -> datetime | None:
+    """Parse BuildKit's RFC 3339 nanosecond timestamps."""
+    if not value:
+        return None
+    value = re.sub(r"(\.\d{6})\d+", r"\1", value).replace("Z", "+00:00")
+    return datetime.fromisoformat(value)
+
+
+def categorize_step(command: str) -> str:
+    """Map a Dockerfile instruction or shell command to a step category."""
+    if command.startswith(("[internal]", "[auth]", "exporting", "resolve ")):
+        return "internal"
+    if re.match(r"^(FROM|COPY|ADD|WORKDIR|ENV|ARG|LABEL)\b", command):
+        return command.split()[0].lower()
+    for category, pattern in STEP_CATEGORIES:
+        if re.search(pattern, command):
+            return category
+    return "other"
+
+
+def read_rawjson(path: Path) -> tuple[dict, dict]:
+    """Collect the final state of every vertex and its log lines from rawjson."""
+    vertexes = {}
+    logs = {}
+    for line in path.read_text().splitlines():
+        line = line.strip()
+        if not line.startswith("{"):
+            continue
+        status = json.loads(line)
+        for vertex in status.get("vertexes") or []:
+            vertexes.setdefault(vertex["digest"], {}).update(
+                {k: v for k, v in vertex.items() if v is not None}
+            )
+        for log in status.get("logs") or []:
+            data = base64.b64decode(log.get("data") or "").decode(errors="replace")
+            logs.setdefault(log["vertex"], []).append((log.get("timestamp"), data))
+    return vertexes, logs
+
+
+def split_vertex_time(
+    command: str, started: datetime, completed: datetime, logs: list
+) -> dict:
+    """Split a RUN step's time across the commands traced by `set -x`.
+
+    Time between two `+ cmd` trace lines is attributed to the first command's
+    category; steps without traces are attributed by their command.
+    """
+    traces = []
+    for timestamp, data in logs:
+        for text in data.splitlines():
+            if text.startswith("+ ") and parse_buildkit_time(timestamp):
+                traces.append((parse_buildkit_time(timestamp), text[2:]))
+    if not traces:
+        return {categorize_step(command): (completed - started).total_seconds()}
+
+    split = {}
+    boundaries = [started] + [t for t, _ in traces[1:]] + [completed]
+    for (_, text), begin, end in zip(traces, boundaries, boundaries[1:]):
+        category = categorize_step(text)
+        split[category] = split.get(category, 0.0) + max(
+            (end - begin).total_seconds(), 0.0
+        )
+    return split
+
+
+def get_build_timings(target: str, path: Path) -> dict:
+    """Attribute the time of one build to stages, steps and step categories."""
+    vertexes, logs = read_rawjson(path)
+    steps = []
+    stages = {}
+    categories = {}
+    starts, ends = [], []
+    for digest, vertex in vertexes.items():
+        started = parse_buildkit_time(vertex.get("started"))
+        completed = parse_buildkit_time(vertex.get("completed"))
+        if not started or not completed:
+            continue
+        starts.append(started)
+        ends.append(completed)
+        name = vertex.get("name", digest)
+        match = VERTEX_NAME.match(name)
+        stage = (match.group("stage") if match else None) or "internal"
+        command = match.group("command") if match else name
+        seconds = (completed - started).total_seconds()
+        split = {}
+        if not vertex.get("cached"):
+            split = split_vertex_time(command, started, completed, logs.get(digest, []))
+        for category, value in split.items():
+            categories[category] = categories.get(category, 0.0) + value
+        stages[stage] = stages.get(stage, 0.0) + seconds
+        steps.append(
+            {
+                "name": name,
+                "stage": stage,
+                "seconds": round(seconds, 2),
+                "cached": bool(vertex.get("cached")),
+                "categories": {k: round(v, 2) for k, v in split.items()},
+            }
+        )
+
+    steps.sort(key=lambda step: step["seconds"], reverse=True)
+    return {
+        "target": target,
+        "timestamp": int(time.time()),
+        "wall_seconds": round((max(ends) - min(starts)).total_seconds(), 2)
+        if starts
+        else 0.0,
+        "stages": {k: round(v, 2) for k, v in sorted(stages.items())},
+        "categories": {k: round(v, 2) for k, v in sorted(categories.items())},
+        "steps": steps,
+    }
+
+
+def print_build_timings(report: dict, previous: dict | None):
+    """Print per-category and per-stage times, with deltas against previous."""
+
+    def row(label, seconds, before):
+        delta = ""
+        if before is not None:
+            delta = f"{seconds - before:+8.1f}s"
+            if before:
+                delta += f" ({(seconds - before) / before * 100:+.0f}%)"
+        print(f"  {label:<30} {seconds:>8.1f}s {delta}")
+
+    print(f"{report['target']}: {report['wall_seconds']:.1f}s wall")
+    for section in ("categories", "stages"):
+        print(f" {section}:")
+        before = previous[section] if previous else {}
+        for label, seconds in sorted(
+            report[section].items(), key=lambda item: item[1], reverse=True
+        ):
+            row(label, seconds, before.get(label, 0.0) if previous else None)
+    print(" slowest steps:")
+    for step in report["steps"][:5]:
+        print(f"  {step['seconds']:>8.1f}s {step['name'][:70]}")
+
+
+def is_pgo_entry(entry: dict) -> bool:
+    """Whether an entry runs a PGO workload, which cannot be cross-built."""
+    return (entry.get("build_args") or {}).get("PGO") == "on"
+
+
+def get_bake_target_name(entry: dict) -> str:
+    """Bake target name for a matrix entry (bake does not allow dots)."""
+    return get_entry_name(entry).replace(".", "_")
+
+
+def get_bake(plan: dict, repo_root: Path | None = None) -> dict:
+    """Convert a (non-split) build plan into a buildx bake JSON definition.
+
+    Every entry becomes a target; the `default` group builds everything and
+    one group per variant allows e.g. `docker buildx bake alpine`. Each
+    compressed image is a target inheriting its entry, grouped by compression
+    (e.g. `docker buildx bake zstd --push`). PGO flavors are left out: they
+    only build natively, one platform per runner, so only the split plan
+    builds them.
+
+    With `repo_root`, a `verifier` target builds verifier/Dockerfile, and
+    entries built from the same verifier image tag use it through a named
+    context instead of pulling the published image.
+    """
+    targets = {}
+    groups = {"default": {"targets": []}}
+    verifier = get_verifier_image(repo_root) if repo_root else None
+    if verifier:
+        targets["verifier"] = {
+            "context": "verifier",
+            "dockerfile": "Dockerfile",
+            "tags": [verifier],
+            "platforms": VERIFIER_PLATFORMS,
+        }
+    for entry in plan["matrix"]["include"]:
+        if entry["action"] == "skip" or is_pgo_entry(entry):
+            continue
+        name = get_bake_target_name(entry)
+        target = {
+            "context": entry["build_path"],
+            "dockerfile": "Dockerfile",
+            "tags": entry["tags"],
+            "platforms": entry["platforms"].split(","),
+        }
+        if entry.get("build_args"):
+            target["args"] = entry["build_args"]
+        if entry.get("cache_from"):
+            target["cache-from"] = entry["cache_from"]
+        if entry.get("cache_to"):
+            target["cache-to"] = [entry["cache_to"]]
+        if verifier:
+            dockerfile = repo_root / entry["build_path"] / "Dockerfile"
+            if get_dockerfile_verifier(dockerfile) == verifier:
+                target["contexts"] = {verifier: "target:verifier"}
+        targets[name] = target
+        groups["default"]["targets"].append(name)
+        groups.setdefault(entry["variant"], {"targets": []})["targets"].append(name)
+        for compressed in entry.get("compressions", []):
+            compressed_name = f"{name}-{compressed['compression']}"
+            targets[compressed_name] = {
+                "inherits": [name],
+                "tags": compressed["tags"],
+                "output": [f"type=image,{compressed['output']}"],
+            }
+            group = groups.setdefault(compressed["compression"], {"targets": []})
+            group["targets"].append(compressed_name)
+    return {"group": groups, "target": targets}
+
+
+def cmd_bake(args):
+    """Handle 'bake' command."""
+    repo_root = get_repo_root()
+    plan = get_plan(
+        args.ref,
+        repo_root,
+        args.version,
+        args.since,
+        cache_backend=args.cache_backend,
+        cache_location=args.cache_location,
+        flavors=args.flavors,
+        compressions=args.compression,
+    )
+    bake = get_bake(plan, repo_root)
+    bake = json.dumps(bake, indent=2) + "\n"
+    if args.output:
+        Path(args.output).write_text(bake)
+    else:
+        print(bake, end="")
+
+
+def cmd_plan(args):
+    """Handle 'plan' command."""
+    repo_root = get_repo_root()
+    published = load_published(args.published) if args.skip_unchanged else None
+    plan = get_plan(
+        args.ref,
+        repo_root,
+        args.version,
+        args.since,
+        published,
+        args.split_platforms,
+        args.cache_backend,
+        args.cache_location,
+        args.flavors,
+        args.compression,
+    )
+    if args.durations or args.slots:
+        durations = load_durations(args.durations) if args.durations else {}
+        plan = balance_plan(plan, durations, args.slots)
+    print(json.dumps(plan, separators=(",", ":")))
+
+
+def cmd_pin_verifier(args):
+    """Handle 'pin-verifier' command."""
+    repo_root = get_repo_root()
+    current = get_verifier_pins(repo_root)
+    changed = {}
+    for name, lookup in VERIFIER_PINS.items():
+        if name == "DEBIAN_SNAPSHOT" and current[name] and not changed:
+            print(f"{name}: {current[name]} (kept with DEBIAN_DIGEST)")
+            continue
+        try:
+            latest = lookup()
+        except (OSError, ValueError, LookupError, RuntimeError) as e:
+            print(f"Error: could not look up the latest {name}: {e}", file=sys.stderr)
+            sys.exit(1)
+        status = "up to date" if current[name] == latest else "outdated"
+        print(f"{name}: {current[name] or '(unset)'} -> {latest} ({status})")
+        if current[name] != latest:
+            changed[name] = latest
+    if changed and args.write:
+        image = write_verifier_pins(repo_root, changed)
+        print(f"Pinned under {image}; review and commit verifier/ and the Dockerfiles")
+
+
+def cmd_record_published(args):
+    """Handle 'record-published' command."""
+    entries = []
+    for entry_file in args.entries:
+        data = json.loads(Path(entry_file).read_text())
+        data = data.get("matrix", data)
+        entries.extend(data["include"] if "include" in data else [data])
+    record_published(args.published, entries)
+
+
+def cmd_record_durations(args):
+    """Handle 'record-durations' command."""
+    samples = [json.loads(Path(f).read_text()) for f in args.samples]
+    record_durations(args.durations, samples)
+
+
+def cmd_image_report(args):
+    """Handle 'image-report' command."""
+    history = {}
+    if args.history.exists():
+        history = json.loads(args.history.read_text())
+
+    failed = False
+    print(f"{'IMAGE':<40} {'SIZE':>10} {'GZIP':>10} {'LAYERS':>6} {'START':>8}")
+    for image in args.images:
+        try:
+            current = measure_image(image, args.runs)
+        except (RuntimeError, OSError) as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+        print(
+            f"{image:<40} {current['size'] / 1e6:>9.1f}M "
+            f"{current['compressed_size'] / 1e6:>9.1f}M {current['layers']:>6} "
+            f"{current['start_seconds']:>7.2f}s"
+        )
+        records = history.setdefault(image, [])
+        regressions = []
+        if records:
+            regressions = get_regressions(
+                records[-1], current, args.max_size_increase, args.max_start_increase
+            )
+        for regression in regressions:
+            print(f"  Regression: {regression}", file=sys.stderr)
+        # Regressing measurements are not recorded, so they keep failing
+        if regressions:
+            failed = True
+        else:
+            records.append(current)
+
+    args.history.parent.mkdir(parents=True, exist_ok=True)
+    args.history.write_text(json.dumps(history, indent=2, sort_keys=True) + "\n")
+    if failed:
+        sys.exit(1)
+
+
+def cmd_benchmark(args):
+    """Handle 'benchmark' command."""
+    print(f"{'IMAGE':<45} {'HEIGHT':>6} {'REINDEX':>9} {'SPEEDUP':>8}")
+    baseline = None
+    for image in args.images:
+        try:
+            result = run_benchmark(image, args.blocks, args.outputs, args.runs)
+        except (RuntimeError, OSError) as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+        seconds = result["reindex_seconds"]
+        baseline = baseline or seconds
+        print(
+            f"{image:<45} {result['height']:>6} {seconds:>8.2f}s "
+            f"{baseline / seconds:>7.2f}x"
+        )
+
+
+def cmd_pull_benchmark(args):
+    """Handle 'pull-benchmark' command."""
+    try:
+        results = run_pull_benchmark(args.images, args.runs, args.port)
+    except (RuntimeError, OSError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    print(f"{'IMAGE':<45} {'PULL':>9} {'START':>8} {'SPEEDUP':>8}")
+    baseline = results[0]["pull_seconds"]
+    for result in results:
+        seconds = result["pull_seconds"]
+        print(
+            f"{result['image']:<45} {seconds:>8.2f}s {result['start_seconds']:>7.2f}s "
+            f"{baseline / seconds:>7.2f}x"
+        )
+
+
+def cmd_build_timings(args):
+    """Handle 'build-timings' command."""
+    if args.logs:
+        _, logs = read_rawjson(args.rawjson)
+        for lines in logs.values():
+            for _, data in lines:
+                print(data, end="")
+        return
+
+    report = get_build_timings(args.target, args.rawjson)
+    history_file = args.reports_dir / f"{args.target}.json"
+    history = []
+    if history_file.exists():
+        history = json.loads(history_file.read_text())
+    print_build_timings(report, history[-1] if history else None)
+
+    history = (history + [report])[-TIMINGS_HISTORY:]
+    history_file.parent.mkdir(parents=True, exist_ok=True)
+    history_file.write_text(json.dumps(history, indent=2) + "\n")
+
+
 def cmd_matrix(args):
     """Handle 'matrix' command."""
     repo_root = get_repo_root()
-    matrix = get_matrix(args.ref, repo_root, getattr(args, "version", None))
+    matrix = get_matrix(args.ref, repo_root, args.version, args.since)
     print(json.dumps(matrix, separators=(",", ":")))
 
 
@@ -256,6 +1466,50 @@ def cmd_should_push(args):
     print("true" if result else "false")
 
 
+def add_matrix_arguments(parser: argparse.ArgumentParser):
+    """Add the options shared by the 'plan' and 'matrix' commands."""
+    parser.add_argument(
+        "--ref",
+        required=True,
+        help="GitHub ref (e.g., refs/tags/v30.2, refs/heads/master)",
+    )
+    parser.add_argument(
+        "--version",
+        help="Override: build only this version (e.g., 30.2)",
+    )
+    parser.add_argument(
+        "--since",
+        metavar="BASE_REF",
+        help="Only build contexts changed since this git ref (branch builds)",
+    )
+
+
+def add_compression_arguments(parser: argparse.ArgumentParser):
+    """Add the --compression option shared by plan and bake."""
+    parser.add_argument(
+        "--compression",
+        action="append",
+        choices=sorted(LAYER_COMPRESSIONS),
+        help="Also push images with these layer compressions, tagged "
+        "<tag>-<compression> (repeatable)",
+    )
+
+
+def add_cache_arguments(parser: argparse.ArgumentParser):
+    """Add the build cache options shared by the 'plan' and 'bake' commands."""
+    parser.add_argument(
+        "--cache-backend",
+        choices=["none", "registry", "local"],
+        default="none",
+        help="Emit buildx cache-from/cache-to settings for this backend",
+    )
+    parser.add_argument(
+        "--cache-location",
+        help=f"Cache repository (default: {DEFAULT_CACHE_REPO}) "
+        f"or directory (default: {DEFAULT_CACHE_DIR})",
+    )
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="CI helper for bitcoin-core-docker builds",
@@ -264,16 +1518,177 @@ def main():
     )
     subparsers = parser.add_subparsers(dest="command", required=True)
 
-    matrix_parser = subparsers.add_parser("matrix", help="Output build matrix as JSON")
-    matrix_parser.add_argument(
-        "--ref",
-        required=True,
-        help="GitHub ref (e.g., refs/tags/v30.2, refs/heads/master)",
+    plan_parser = subparsers.add_parser(
+        "plan", help="Output matrix, tags and push decision as JSON"
     )
-    matrix_parser.add_argument(
-        "--version",
-        help="Override: build only this version (e.g., 30.2)",
+    add_matrix_arguments(plan_parser)
+    plan_parser.add_argument(
+        "--skip-unchanged",
+        action="store_true",
+        help="Mark entries already published with the same digest as skip/retag",
+    )
+    plan_parser.add_argument(
+        "--split-platforms",
+        action="store_true",
+        help="One job per platform on native runners, plus a manifest merge plan",
+    )
+    plan_parser.add_argument(
+        "--flavors",
+        action="store_true",
+        help="Add -daemon/-cli release images and the latest release's optimized "
+        "alpine flavors (LTO, -march, PGO, depends)",
     )
+    add_cache_arguments(plan_parser)
+    add_compression_arguments(plan_parser)
+    plan_parser.add_argument(
+        "--durations",
+        type=Path,
+        help="Order the matrix longest-first using this duration history",
+    )
+    plan_parser.add_argument(
+        "--slots",
+        type=int,
+        default=0,
+        help="Report an LPT-first packing into this many runner slots",
+    )
+    plan_parser.add_argument(
+        "--published",
+        type=Path,
+        default=DEFAULT_PUBLISHED,
+        help=f"Published digest record (default: {DEFAULT_PUBLISHED})",
+    )
+
+    bake_parser = subparsers.add_parser(
+        "bake", help="Output a docker buildx bake definition (JSON)"
+    )
+    add_matrix_arguments(bake_parser)
+    bake_parser.add_argument(
+        "--flavors",
+        action="store_true",
+        help="Add -daemon/-cli release images and the latest release's optimized "
+        "alpine flavors (LTO, -march, PGO, depends)",
+    )
+    add_cache_arguments(bake_parser)
+    add_compression_arguments(bake_parser)
+    bake_parser.add_argument(
+        "--output", "-o", help="Write to this file (e.g. docker-bake.json)"
+    )
+
+    pin_parser = subparsers.add_parser(
+        "pin-verifier",
+        help="Compare the verifier image's pinned inputs with their latest values",
+    )
+    pin_parser.add_argument(
+        "--write",
+        action="store_true",
+        help="Pin the latest values under a new VERIFIER_VERSION and move the "
+        "release Dockerfiles to it",
+    )
+
+    durations_parser = subparsers.add_parser(
+        "record-durations", help="Record build durations of matrix entries"
+    )
+    durations_parser.add_argument(
+        "samples", nargs="+", help='JSON files holding {"target": ..., "seconds": ...}'
+    )
+    durations_parser.add_argument(
+        "--durations",
+        type=Path,
+        default=DEFAULT_DURATIONS,
+        help=f"Duration history (default: {DEFAULT_DURATIONS})",
+    )
+
+    report_parser = subparsers.add_parser(
+        "image-report", help="Measure image size, layers and cold-start time"
+    )
+    report_parser.add_argument("images", nargs="+", help="Local images to inspect")
+    report_parser.add_argument(
+        "--runs", type=int, default=5, help="Timed `-version` runs"
+    )
+    report_parser.add_argument(
+        "--history",
+        type=Path,
+        default=DEFAULT_IMAGE_REPORT,
+        help=f"Report history (default: {DEFAULT_IMAGE_REPORT})",
+    )
+    report_parser.add_argument(
+        "--max-size-increase",
+        type=float,
+        default=5.0,
+        help="Fail if a size grew by more than this percentage (default: 5)",
+    )
+    report_parser.add_argument(
+        "--max-start-increase",
+        type=float,
+        default=20.0,
+        help="Fail if start time grew by more than this percentage (default: 20)",
+    )
+
+    benchmark_parser = subparsers.add_parser(
+        "benchmark", help="Compare regtest -reindex time across images"
+    )
+    benchmark_parser.add_argument(
+        "images", nargs="+", help="Local images; the first is the baseline"
+    )
+    benchmark_parser.add_argument(
+        "--blocks", type=int, default=200, help="Blocks with transactions to mine"
+    )
+    benchmark_parser.add_argument(
+        "--outputs", type=int, default=50, help="Transaction outputs per block"
+    )
+    benchmark_parser.add_argument(
+        "--runs", type=int, default=3, help="Timed reindexes per image (median)"
+    )
+
+    pull_parser = subparsers.add_parser(
+        "pull-benchmark", help="Compare pull and start time through a local registry"
+    )
+    pull_parser.add_argument(
+        "images",
+        nargs="+",
+        help="Registry images, e.g. 31.0 and 31.0-zstd; the first is the baseline",
+    )
+    pull_parser.add_argument(
+        "--runs", type=int, default=3, help="Timed pulls per image (median)"
+    )
+    pull_parser.add_argument(
+        "--port", type=int, default=5000, help="Local registry port (default: 5000)"
+    )
+
+    timings_parser = subparsers.add_parser(
+        "build-timings", help="Attribute rawjson build time to stages and steps"
+    )
+    timings_parser.add_argument(
+        "rawjson", type=Path, help="Output of `docker buildx build --progress=rawjson`"
+    )
+    timings_parser.add_argument(
+        "--target", default="build", help="Report name (e.g., 30.2-debian-linux-amd64)"
+    )
+    timings_parser.add_argument(
+        "--reports-dir",
+        type=Path,
+        default=DEFAULT_TIMINGS_DIR,
+        help=f"Per-target report history (default: {DEFAULT_TIMINGS_DIR})",
+    )
+    timings_parser.add_argument(
+        "--logs", action="store_true", help="Only print the decoded build logs"
+    )
+
+    record_parser = subparsers.add_parser(
+        "record-published", help="Record digests of pushed matrix entries"
+    )
+    record_parser.add_argument(
+        "entries", nargs="+", help="JSON files holding a plan, a matrix or one entry"
+    )
+    record_parser.add_argument(
+        "--published",
+        type=Path,
+        default=DEFAULT_PUBLISHED,
+        help=f"Published digest record (default: {DEFAULT_PUBLISHED})",
+    )
+
+    matrix_parser = subparsers.add_parser("matrix", help="Output build matrix as JSON")
+    add_matrix_arguments(matrix_parser)
 
     tags_parser = subparsers.add_parser("tags", help="Output Docker tags for a version")
     tags_parser.add_argument(
@@ -298,7 +1713,25 @@ def main():
 
     args = parser.parse_args()
 
-    if args.command == "matrix":
+    if args.command == "plan":
+        cmd_plan(args)
+    elif args.command == "bake":
+        cmd_bake(args)
+    elif args.command == "benchmark":
+        cmd_benchmark(args)
+    elif args.command == "pull-benchmark":
+        cmd_pull_benchmark(args)
+    elif args.command == "build-timings":
+        cmd_build_timings(args)
+    elif args.command == "image-report":
+        cmd_image_report(args)
+    elif args.command == "pin-verifier":
+        cmd_pin_verifier(args)
+    elif args.command == "record-durations":
+        cmd_record_durations(args)
+    elif args.command == "record-published":
+        cmd_record_published(args)
+    elif args.command == "matrix":
         cmd_matrix(args)
     elif args.command == "tags":
         cmd_tags(args)
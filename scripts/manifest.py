@@ -0,0 +1,264 @@
+"""
+Repository manifest index shared by ci.py and version_manager.py.
+
+A single scan of the repository records every build context (active,
+master and deprecated), its variants, Dockerfile paths and a content
+digest. The result is cached in .cache/manifest.json and reused until the
+mtime of a scanned directory or context file changes. Checking the cache
+still costs one stat() per directory and context file, so it grows with
+the number of files, but repeated commands skip reading and hashing them.
+
+Zero dependencies - uses only Python standard library.
+"""
+
+import hashlib
+import json
+import re
+from pathlib import Path
+
+CACHE_FILE = Path(".cache") / "manifest.json"
+CACHE_FORMAT = 1
+
+# Top-level directories that never hold release build contexts.
+EXCLUDE = {"deprecated", "scripts", "verifier"}
+
+
+class Version:
+    """Parsed version with comparison support."""
+
+    def __init__(self, version_str: str):
+        self.original = version_str
+        self.major = 0
+        self.minor = 0
+        self.patch = 0
+        self.rc = None
+
+        # Parse: major.minor[.patch][rcN]
+        match = re.match(r"^(\d+)\.(\d+)(?:\.(\d+))?(rc(\d+))?$", version_str)
+        if not match:
+            raise ValueError(f"Invalid version format: {version_str}")
+
+        self.major = int(match.group(1))
+        self.minor = int(match.group(2))
+        self.patch = int(match.group(3)) if match.group(3) else 0
+        self.rc = int(match.group(5)) if match.group(5) else None
+
+    def __str__(self):
+        return self.original
+
+    def __repr__(self):
+        return f"Version({self.original!r})"
+
+    def __lt__(self, other):
+        # Compare major.minor.patch first
+        self_tuple = (self.major, self.minor, self.patch)
+        other_tuple = (other.major, other.minor, other.patch)
+        if self_tuple != other_tuple:
+            return self_tuple < other_tuple
+        # RC versions are less than release versions
+        if self.rc is None and other.rc is None:
+            return False
+        if self.rc is None:
+            return False  # self is release, other is RC
+        if other.rc is None:
+            return True  # self is RC, other is release
+        return self.rc < other.rc
+
+    def __eq__(self, other):
+        return (
+            self.major == other.major
+            and self.minor == other.minor
+            and self.patch == other.patch
+            and self.rc == other.rc
+        )
+
+    def __le__(self, other):
+        return self < other or self == other
+
+    def __gt__(self, other):
+        return not self <= other
+
+    def __ge__(self, other):
+        return not self < other
+
+    @property
+    def is_rc(self):
+        return self.rc is not None
+
+
+def parse_version(name: str) -> Version | None:
+    """Parse a directory name as a Version, or None (e.g. for master)."""
+    try:
+        return Version(name)
+    except ValueError:
+        return None
+
+
+def context_files(context: Path) -> list[Path]:
+    """Files that make up a build context, excluding nested variant contexts."""
+    files = []
+    for path in sorted(context.rglob("*")):
+        if not path.is_file():
+            continue
+        rel = path.relative_to(context)
+        if len(rel.parts) > 1 and (context / rel.parts[0] / "Dockerfile").exists():
+            continue
+        files.append(path)
+    return files
+
+
+def context_digest(context: Path) -> str:
+    """SHA256 over the relative names and contents of a context's files."""
+    digest = hashlib.sha256()
+    for path in context_files(context):
+        digest.update(path.relative_to(context).as_posix().encode() + b"\0")
+        digest.update(path.read_bytes())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class Manifest:
+    """Index of every build context in the repository."""
+
+    def __init__(self, repo_root: Path, data: dict):
+        self.repo_root = repo_root
+        self.data = data
+
+    @classmethod
+    def load(cls, repo_root: Path, use_cache: bool = True) -> "Manifest":
+        """Load the cached manifest, rebuilding it if anything has changed."""
+        cache_file = repo_root / CACHE_FILE
+        if use_cache and cache_file.exists():
+            try:
+                data = json.loads(cache_file.read_text())
+                signature = cls._signature(repo_root, data["scanned"])
+                if data["format"] == CACHE_FORMAT and signature == data["signature"]:
+                    return cls(repo_root, data)
+            except (OSError, ValueError, KeyError):
+                pass
+
+        data = cls._scan(repo_root)
+        if use_cache:
+            try:
+                cache_file.parent.mkdir(exist_ok=True)
+                tmp = cache_file.with_name(cache_file.name + ".part")
+                tmp.write_text(json.dumps(data, indent=2, sort_keys=True))
+                tmp.replace(cache_file)
+            except OSError:
+                pass
+        return cls(repo_root, data)
+
+    @staticmethod
+    def _signature(repo_root: Path, scanned: list[str]) -> dict:
+        """mtimes of every scanned directory and context file.
+
+        One stat() per path: cheaper than rehashing the contexts, but not
+        constant in the size of the repository.
+        """
+        signature = {}
+        for rel in scanned:
+            try:
+                signature[rel] = (repo_root / rel).stat().st_mtime_ns
+            except OSError:
+                signature[rel] = None
+        return signature
+
+    @classmethod
+    def _scan(cls, repo_root: Path) -> dict:
+        """Walk the repository once and index every build context."""
+        scanned = [".", "deprecated"]
+        entries = {}
+
+        def add_entry(path: Path, location: str):
+            rel = path.relative_to(repo_root).as_posix()
+            scanned.append(rel)
+            variants = {}
+            if (path / "Dockerfile").exists():
+                variants["debian"] = path
+            for sub in sorted(path.iterdir()):
+                if sub.is_dir():
+                    scanned.append(sub.relative_to(repo_root).as_posix())
+                    if (sub / "Dockerfile").exists():
+                        variants[sub.name] = sub
+            if not variants:
+                return
+            version = parse_version(path.name)
+            entries[rel] = {
+                "name": path.name,
+                "location": location,
+                "version": version is not None,
+                "variants": {},
+            }
+            for variant, context in variants.items():
+                files = context_files(context)
+                for f in files:
+                    scanned.append(f.relative_to(repo_root).as_posix())
+                    scanned.append(f.parent.relative_to(repo_root).as_posix())
+                context_rel = context.relative_to(repo_root).as_posix()
+                entries[rel]["variants"][variant] = {
+                    "context": context_rel,
+                    "dockerfile": f"{context_rel}/Dockerfile",
+                    "digest": context_digest(context),
+                }
+
+        for path in sorted(repo_root.iterdir()):
+            if not path.is_dir() or path.name.startswith("."):
+                continue
+            if path.name not in EXCLUDE:
+                add_entry(path, "active")
+        deprecated = repo_root / "deprecated"
+        if deprecated.is_dir():
+            for path in sorted(deprecated.iterdir()):
+                if path.is_dir():
+                    add_entry(path, "deprecated")
+
+        releases = [
+            Version(e["name"])
+            for e in entries.values()
+            if e["location"] == "active" and e["version"]
+        ]
+        stable = [v for v in releases if not v.is_rc]
+        latest = max(stable) if stable else None
+
+        scanned = sorted(set(scanned))
+        return {
+            "format": CACHE_FORMAT,
+            "scanned": scanned,
+            "signature": cls._signature(repo_root, scanned),
+            "entries": entries,
+            "latest": str(latest) if latest else None,
+        }
+
+    def _entries(self, location: str = "active") -> list[dict]:
+        entries = self.data["entries"].values()
+        return [e for e in entries if e["location"] == location]
+
+    def active_dirs(self) -> list[str]:
+        """Top-level directories with a Dockerfile (including master)."""
+        return [e["name"] for e in self._entries() if "debian" in e["variants"]]
+
+    def versions(self, location: str = "active") -> list[Version]:
+        """Sorted versions in the given location (active or deprecated)."""
+        entries = self._entries(location)
+        return sorted(Version(e["name"]) for e in entries if e["version"])
+
+    @property
+    def latest(self) -> Version | None:
+        """The highest active non-RC version."""
+        return Version(self.data["latest"]) if self.data["latest"] else None
+
+    def entry(self, name: str) -> dict | None:
+        """The manifest entry for an active top-level directory."""
+        return self.data["entries"].get(name)
+
+    def variants(self, name: str) -> list[str]:
+        """Variants available for a directory, debian first."""
+        entry = self.entry(name)
+        if not entry:
+            return []
+        return sorted(entry["variants"], key=lambda v: (v != "debian", v))
+
+    def variant(self, name: str, variant: str) -> dict | None:
+        """Context, Dockerfile and digest for one variant of a directory."""
+        entry = self.entry(name)
+        return entry["variants"].get(variant) if entry else None
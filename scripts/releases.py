@@ -0,0 +1,397 @@
+"""
+Bitcoin Core release artifact cache.
+
+Downloads release artifacts (SHA256SUMS, SHA256SUMS.asc, the platform
+tarballs used by the Debian images and the source tarball used by the
+Alpine images) into a local cache and checks them against SHA256SUMS.
+
+Used by version_manager.py; not intended to be run directly.
+
+Zero dependencies - uses only Python standard library.
+"""
+
+import hashlib
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+DEFAULT_HOST = "https://bitcoincore.org"
+
+# Mirrors whose SHA256SUMS must match DEFAULT_HOST, as verify.py checks.
+DEFAULT_COMPARE_HOSTS = ("https://bitcoin.org",)
+
+# Release tarballs consumed by the Debian images (see TARGETPLATFORM mapping
+# in the Dockerfiles).
+PLATFORMS = ("x86_64-linux-gnu", "aarch64-linux-gnu", "arm-linux-gnueabihf")
+
+USER_AGENT = "bitcoin-core-docker-release-cache"
+CHUNK_SIZE = 1 << 20
+
+
+def default_cache_dir() -> Path:
+    """Return the release cache directory ($BITCOIN_RELEASE_CACHE or XDG)."""
+    if os.environ.get("BITCOIN_RELEASE_CACHE"):
+        return Path(os.environ["BITCOIN_RELEASE_CACHE"])
+    xdg = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(xdg) / "bitcoin-core-docker" / "releases"
+
+
+def release_url(host: str, version: str) -> str:
+    """Return the release directory URL for a version (e.g. 30.2, 31.1rc1)."""
+    match = re.match(r"^(.*?)rc(\d+)$", version)
+    if match:
+        return f"{host}/bin/bitcoin-core-{match.group(1)}/test.rc{match.group(2)}"
+    return f"{host}/bin/bitcoin-core-{version}"
+
+
+def artifact_names(version: str, platforms=PLATFORMS) -> list[str]:
+    """Return the tarball names the images need for a version."""
+    names = [f"bitcoin-{version}-{platform}.tar.gz" for platform in platforms]
+    names.append(f"bitcoin-{version}.tar.gz")
+    return names
+
+
+def parse_sha256sums(text: str) -> dict[str, str]:
+    """Parse a SHA256SUMS file into a {filename: hexdigest} mapping."""
+    sums = {}
+    for line in text.splitlines():
+        parts = line.split()
+        if len(parts) == 2:
+            sums[parts[1].lstrip("*")] = parts[0].lower()
+    return sums
+
+
+def sha256_file(path: Path) -> str:
+    """Return the hex SHA256 of a file."""
+    digest = hashlib.sha256()
+    with path.open("rb") as f:
+        while chunk := f.read(CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def http_get(url: str, headers: dict | None = None, timeout: int = 60):
+    """GET a URL, returning (status, headers, body).
+
+    A 304 Not Modified is returned as a status rather than raised.
+    """
+    request = urllib.request.Request(url, headers={"User-Agent": USER_AGENT})
+    for key, value in (headers or {}).items():
+        request.add_header(key, value)
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return response.status, response.headers, response.read()
+    except urllib.error.HTTPError as e:
+        if e.code == 304:
+            return 304, e.headers, b""
+        raise
+
+
+def download(url: str, dest: Path, timeout: int = 60):
+    """Stream a URL to dest, writing via a temporary file."""
+    request = urllib.request.Request(url, headers={"User-Agent": USER_AGENT})
+    tmp = dest.with_name(dest.name + ".part")
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        with tmp.open("wb") as f:
+            shutil.copyfileobj(response, f, CHUNK_SIZE)
+    tmp.replace(dest)
+
+
+def count_good_sigs(sums_file: Path, sig_file: Path) -> int:
+    """Count good signatures on SHA256SUMS using the local gpg keyring."""
+    if not shutil.which("gpg"):
+        return 0
+    result = subprocess.run(
+        ["gpg", "--status-fd", "1", "--verify", str(sig_file), str(sums_file)],
+        capture_output=True,
+        text=True,
+    )
+    return sum(1 for line in result.stdout.splitlines() if " GOODSIG " in line)
+
+
+class MetadataCache:
+    """ETag / Last-Modified validators for small, rarely changing files.
+
+    SHA256SUMS, SHA256SUMS.asc and directory listings are revalidated with
+    a conditional GET; a 304 keeps the cached copy and skips the body.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.entries = {}
+        if path.exists():
+            self.entries = json.loads(path.read_text())
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(self.path.name + ".part")
+        tmp.write_text(json.dumps(self.entries, indent=2, sort_keys=True))
+        tmp.replace(self.path)
+
+    def fetch(self, url: str, dest: Path) -> bool:
+        """Fetch url into dest, returning False if the cached copy was current."""
+        with self.lock:
+            entry = self.entries.get(url, {}) if dest.exists() else {}
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        status, response_headers, body = http_get(url, headers)
+        if status == 304:
+            return False
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        tmp = dest.with_name(dest.name + ".part")
+        tmp.write_bytes(body)
+        tmp.replace(dest)
+        with self.lock:
+            self.entries[url] = {
+                "etag": response_headers.get("ETag"),
+                "last_modified": response_headers.get("Last-Modified"),
+            }
+            self.save()
+        return True
+
+
+class ArtifactResult:
+    """Outcome of fetching and checking one release artifact."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.ok = False
+        self.cached = False
+        self.seconds = 0.0
+        self.error = None
+
+    def __str__(self):
+        if self.error:
+            status = f"FAILED ({self.error})"
+        elif self.cached:
+            status = "cached"
+        else:
+            status = "downloaded"
+        return f"{self.name}: {status} in {self.seconds:.1f}s"
+
+
+class ReleaseCache:
+    """Local cache of verified Bitcoin Core release artifacts."""
+
+    def __init__(
+        self,
+        cache_dir: Path | None = None,
+        host: str = DEFAULT_HOST,
+        compare_hosts=DEFAULT_COMPARE_HOSTS,
+        jobs: int = 4,
+        min_good_sigs: int = 0,
+    ):
+        self.cache_dir = cache_dir or default_cache_dir()
+        self.host = host.rstrip("/")
+        self.compare_hosts = [h.rstrip("/") for h in compare_hosts]
+        self.jobs = jobs
+        self.min_good_sigs = min_good_sigs
+        self.metadata = MetadataCache(self.cache_dir / "metadata.json")
+
+    def version_dir(self, version: str) -> Path:
+        return self.cache_dir / version
+
+    @property
+    def sums_status(self) -> str:
+        """How far SHA256SUMS, and so every cached artifact, is trusted."""
+        if self.min_good_sigs:
+            return f"SHA256SUMS has {self.min_good_sigs}+ good signatures"
+        return "UNSIGNED: SHA256SUMS signatures not checked (see --min-good-sigs)"
+
+    def fetch_sums(self, version: str) -> dict[str, str]:
+        """Fetch SHA256SUMS and SHA256SUMS.asc for a version.
+
+        Cached copies are revalidated rather than downloaded again. The
+        SHA256SUMS of each compare host must match the primary host's; an
+        unreachable compare host only produces a warning.
+        """
+        target = self.version_dir(version)
+        base = release_url(self.host, version)
+        for name in ("SHA256SUMS", "SHA256SUMS.asc"):
+            self.metadata.fetch(f"{base}/{name}", target / name)
+        sums = (target / "SHA256SUMS").read_bytes()
+
+        for host in self.compare_hosts:
+            netloc = urllib.parse.urlsplit(host).netloc
+            mirror = target / "hosts" / netloc / "SHA256SUMS"
+            try:
+                self.metadata.fetch(f"{release_url(host, version)}/SHA256SUMS", mirror)
+            except (OSError, urllib.error.URLError) as e:
+                print(f"Warning: {host}: {e}", file=sys.stderr)
+                continue
+            if mirror.read_bytes() != sums:
+                raise ValueError(f"{version}: SHA256SUMS differs on {host}")
+
+        return parse_sha256sums(sums.decode())
+
+    def fetch_artifact(self, version: str, name: str, sums: dict) -> ArtifactResult:
+        """Fetch one artifact unless a copy matching SHA256SUMS is cached."""
+        result = ArtifactResult(name)
+        start = time.monotonic()
+        try:
+            expected = sums.get(name)
+            if not expected:
+                raise ValueError("not listed in SHA256SUMS")
+            path = self.version_dir(version) / name
+            if path.exists() and sha256_file(path) == expected:
+                result.cached = True
+            else:
+                download(f"{release_url(self.host, version)}/{name}", path)
+                if sha256_file(path) != expected:
+                    path.unlink()
+                    raise ValueError("hash mismatch")
+            result.ok = True
+        except (OSError, ValueError, urllib.error.URLError) as e:
+            result.error = str(e)
+        result.seconds = time.monotonic() - start
+        return result
+
+    def fetch_release(self, version: str, platforms=PLATFORMS) -> list[ArtifactResult]:
+        """Fetch and check every artifact for a version concurrently."""
+        sums = self.fetch_sums(version)
+        if self.min_good_sigs:
+            target = self.version_dir(version)
+            good = count_good_sigs(target / "SHA256SUMS", target / "SHA256SUMS.asc")
+            if good < self.min_good_sigs:
+                raise ValueError(
+                    f"{version}: {good} good signatures, need {self.min_good_sigs}"
+                )
+        names = artifact_names(version, platforms)
+        with ThreadPoolExecutor(max_workers=self.jobs) as pool:
+            return list(
+                pool.map(lambda n: self.fetch_artifact(version, n, sums), names)
+            )
+
+
+class ReleaseWatcher:
+    """Poll a host's release listing for new versions.
+
+    Listings go through the MetadataCache, so an unchanged listing costs a
+    single 304 round-trip.
+    """
+
+    RELEASE_DIR = re.compile(r'href="bitcoin-core-(\d+\.\d+(?:\.\d+)?)/"')
+    RC_DIR = re.compile(r'href="test\.rc(\d+)/"')
+
+    def __init__(self, cache: ReleaseCache, recent: int = 3):
+        self.cache = cache
+        self.recent = recent
+        self.state_file = cache.cache_dir / "watch-state.json"
+        self.state = {"seen": []}
+        self.pending = set()
+        self.lock = threading.Lock()
+        self.first_run = not self.state_file.exists()
+        if not self.first_run:
+            self.state = json.loads(self.state_file.read_text())
+
+    def save(self):
+        self.state_file.parent.mkdir(parents=True, exist_ok=True)
+        self.state_file.write_text(json.dumps(self.state, indent=2, sort_keys=True))
+
+    def _listing(self, url: str) -> str:
+        """Return a directory listing, revalidating the cached copy."""
+        name = hashlib.sha256(url.encode()).hexdigest()[:16]
+        dest = self.cache.cache_dir / "listings" / f"{name}.html"
+        self.cache.metadata.fetch(url, dest)
+        return dest.read_text(errors="replace")
+
+    def available_versions(self) -> list[str]:
+        """Return versions (including RCs) published in the recent release dirs."""
+        index = self._listing(f"{self.cache.host}/bin/")
+        bases = sorted(
+            set(self.RELEASE_DIR.findall(index)),
+            key=lambda v: tuple(int(p) for p in v.split(".")),
+        )
+        versions = []
+        for base in bases[-self.recent :]:
+            url = f"{self.cache.host}/bin/bitcoin-core-{base}/"
+            listing = self._listing(url)
+            # A directory can be listed before its SHA256SUMS is uploaded
+            for rc in self.RC_DIR.findall(listing):
+                if 'href="SHA256SUMS"' in self._listing(f"{url}test.rc{rc}/"):
+                    versions.append(f"{base}rc{rc}")
+            if 'href="SHA256SUMS"' in listing:
+                versions.append(base)
+        return versions
+
+    def poll(self) -> list[str]:
+        """Return versions that are neither seen nor being fetched.
+
+        The first poll only records what is already published. Later versions
+        are marked seen by done() once fetched, so failed fetches are retried.
+        """
+        available = self.available_versions()
+        with self.lock:
+            new = [
+                v
+                for v in available
+                if v not in self.state["seen"] and v not in self.pending
+            ]
+            if self.first_run:
+                self.first_run = False
+                self.state["seen"].extend(new)
+                self.save()
+                return []
+            self.pending.update(new)
+        return new
+
+    def done(self, version: str, ok: bool):
+        """Finish fetching a version, marking it seen if every artifact is ok."""
+        with self.lock:
+            self.pending.discard(version)
+            if ok:
+                self.state["seen"].append(version)
+                self.save()
+
+
+def print_results(cache: ReleaseCache, version: str, results: list[ArtifactResult]):
+    """Print a per-artifact summary for a version."""
+    print(f"{version}: {cache.sums_status}")
+    for result in results:
+        print(f"  {result}")
+
+
+def watch(cache: ReleaseCache, interval: int, once: bool):
+    """Poll for new releases and fetch them in the background."""
+    watcher = ReleaseWatcher(cache)
+
+    def prefetch(version):
+        ok = False
+        try:
+            results = cache.fetch_release(version)
+            print_results(cache, version, results)
+            ok = all(result.ok for result in results)
+            if not ok:
+                print(f"{version}: incomplete, retrying next poll", file=sys.stderr)
+        except (OSError, ValueError, urllib.error.URLError) as e:
+            print(f"{version}: prefetch failed: {e}", file=sys.stderr)
+        finally:
+            watcher.done(version, ok)
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        while True:
+            try:
+                new = watcher.poll()
+            except (OSError, urllib.error.URLError) as e:
+                print(f"Warning: polling {cache.host} failed: {e}", file=sys.stderr)
+                new = []
+            for version in new:
+                print(f"New release {version}, fetching into {cache.cache_dir}")
+                pool.submit(prefetch, version)
+            if once:
+                break
+            time.sleep(interval)
@@ -0,0 +1,60 @@
+"""
+Tests for ci.py.
+
+Run from the repository root:
+
+    python -m unittest discover -s scripts
+
+Zero dependencies - uses only Python standard library.
+"""
+
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from ci import get_build_timings
+
+
+def vertex(name: str, started: str, completed: str) -> dict:
+    return {
+        "digest": name,
+        "name": name,
+        "started": f"2026-01-01T00:{started}.000000000Z",
+        "completed": f"2026-01-01T00:{completed}.000000000Z",
+    }
+
+
+class BuildTimingsTest(unittest.TestCase):
+    def timings(self, vertexes: list[dict]) -> dict:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "build.rawjson"
+            path.write_text(json.dumps({"vertexes": vertexes}) + "\n")
+            return get_build_timings("target", path)
+
+    def test_stages(self):
+        report = self.timings(
+            [
+                vertex("[internal] load build definition", "00:00", "00:01"),
+                vertex("[build 2/7] RUN cmake -B build", "00:01", "00:11"),
+                vertex("[fetch 1/2] FROM docker.io/library/alpine", "00:11", "00:13"),
+            ]
+        )
+        self.assertEqual(
+            report["stages"], {"build": 10.0, "fetch": 2.0, "internal": 1.0}
+        )
+
+    def test_platform_prefixed_stages(self):
+        report = self.timings(
+            [
+                vertex("[linux/amd64 build 4/7] RUN make -j4", "00:00", "01:00"),
+                vertex("[linux/arm/v7 build 4/7] RUN make -j4", "00:00", "02:00"),
+                vertex("[linux/arm64 final 2/3] COPY /opt /opt", "02:00", "02:05"),
+            ]
+        )
+        self.assertEqual(report["stages"], {"build": 180.0, "final": 5.0})
+        self.assertEqual(report["categories"]["cmake compile"], 180.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+"""
+Tests for releases.py.
+
+Run from the repository root:
+
+    python -m unittest discover -s scripts
+
+Zero dependencies - uses only Python standard library.
+"""
+
+import http.server
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+from releases import MetadataCache
+
+
+class SumsHandler(http.server.BaseHTTPRequestHandler):
+    """Serves the server's body and ETag, or a 304 when the ETag matches."""
+
+    def do_GET(self):
+        self.server.requests.append(dict(self.headers))
+        if self.headers.get("If-None-Match") == self.server.etag:
+            self.send_response(304)
+            self.send_header("ETag", self.server.etag)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("ETag", self.server.etag)
+        self.send_header("Content-Length", str(len(self.server.body)))
+        self.end_headers()
+        self.wfile.write(self.server.body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class MetadataCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), SumsHandler)
+        self.server.requests = []
+        self.server.etag = '"v1"'
+        self.server.body = b"first\n"
+        thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = Path(tmp.name)
+        self.url = f"http://127.0.0.1:{self.server.server_port}/SHA256SUMS"
+        self.dest = self.dir / "SHA256SUMS"
+
+    def test_revalidates_with_etag(self):
+        cache = MetadataCache(self.dir / "metadata.json")
+        self.assertTrue(cache.fetch(self.url, self.dest))
+        self.assertEqual(self.dest.read_bytes(), b"first\n")
+        self.assertNotIn("If-None-Match", self.server.requests[0])
+
+        # A 304 keeps the cached file, also for a cache loaded from disk
+        mtime = self.dest.stat().st_mtime_ns
+        cache = MetadataCache(self.dir / "metadata.json")
+        self.assertFalse(cache.fetch(self.url, self.dest))
+        self.assertEqual(self.server.requests[1]["If-None-Match"], '"v1"')
+        self.assertEqual(self.dest.read_bytes(), b"first\n")
+        self.assertEqual(self.dest.stat().st_mtime_ns, mtime)
+
+        # A 200 with a new ETag replaces the file and the stored validator
+        self.server.etag = '"v2"'
+        self.server.body = b"second\n"
+        self.assertTrue(cache.fetch(self.url, self.dest))
+        self.assertEqual(self.dest.read_bytes(), b"second\n")
+        self.assertEqual(cache.entries[self.url]["etag"], '"v2"')
+        self.assertFalse(cache.fetch(self.url, self.dest))
+
+    def test_missing_file_is_refetched(self):
+        cache = MetadataCache(self.dir / "metadata.json")
+        cache.fetch(self.url, self.dest)
+        self.dest.unlink()
+        self.assertTrue(cache.fetch(self.url, self.dest))
+        self.assertNotIn("If-None-Match", self.server.requests[1])
+        self.assertEqual(self.dest.read_bytes(), b"first\n")
+
+
+if __name__ == "__main__":
+    unittest.main()
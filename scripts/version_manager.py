@@ -6,6 +6,7 @@ Commands:
     add <VERSION>       Add a new Bitcoin Core version
     deprecate <VERSION> Deprecate an existing version
     list                List active versions
+    watch               Poll for new releases and pre-fetch their artifacts
 
 Zero dependencies - uses only Python standard library.
 """
@@ -14,70 +15,12 @@ import argparse
 import re
 import shutil
 import sys
+import time
+import urllib.error
 from pathlib import Path
 
-
-class Version:
-    """Parsed version with comparison support."""
-
-    def __init__(self, version_str: str):
-        self.original = version_str
-        self.major = 0
-        self.minor = 0
-        self.patch = 0
-        self.rc = None
-
-        # Parse: major.minor[.patch][rcN]
-        match = re.match(r"^(\d+)\.(\d+)(?:\.(\d+))?(rc(\d+))?$", version_str)
-        if not match:
-            raise ValueError(f"Invalid version format: {version_str}")
-
-        self.major = int(match.group(1))
-        self.minor = int(match.group(2))
-        self.patch = int(match.group(3)) if match.group(3) else 0
-        self.rc = int(match.group(5)) if match.group(5) else None
-
-    def __str__(self):
-        return self.original
-
-    def __repr__(self):
-        return f"Version({self.original!r})"
-
-    def __lt__(self, other):
-        # Compare major.minor.patch first
-        self_tuple = (self.major, self.minor, self.patch)
-        other_tuple = (other.major, other.minor, other.patch)
-        if self_tuple != other_tuple:
-            return self_tuple < other_tuple
-        # RC versions are less than release versions
-        if self.rc is None and other.rc is None:
-            return False
-        if self.rc is None:
-            return False  # self is release, other is RC
-        if other.rc is None:
-            return True  # self is RC, other is release
-        return self.rc < other.rc
-
-    def __eq__(self, other):
-        return (
-            self.major == other.major
-            and self.minor == other.minor
-            and self.patch == other.patch
-            and self.rc == other.rc
-        )
-
-    def __le__(self, other):
-        return self < other or self == other
-
-    def __gt__(self, other):
-        return not self <= other
-
-    def __ge__(self, other):
-        return not self < other
-
-    @property
-    def is_rc(self):
-        return self.rc is not None
+import releases
+from manifest import Manifest, Version
 
 
 class VersionManager:
@@ -90,24 +33,11 @@ class VersionManager:
 
     def get_active_versions(self) -> list[Version]:
         """Return sorted list of active (non-deprecated) versions."""
-        versions = []
-        for path in self.repo_root.iterdir():
-            if not path.is_dir():
-                continue
-            if path.name.startswith("."):
-                continue
-            if path.name in ("deprecated", "master", "scripts"):
-                continue
-            try:
-                versions.append(Version(path.name))
-            except ValueError:
-                continue
-        return sorted(versions)
+        return Manifest.load(self.repo_root).versions()
 
     def get_latest_version(self) -> Version | None:
         """Get the highest non-RC version."""
-        versions = [v for v in self.get_active_versions() if not v.is_rc]
-        return max(versions) if versions else None
+        return Manifest.load(self.repo_root).latest
 
     def get_active_version_for_major(self, major: int) -> Version | None:
         """Get the active version for a given major version."""
@@ -120,13 +50,20 @@ class VersionManager:
         deprecated_path = self.deprecated_dir / version.original
         return active_path.exists() or deprecated_path.exists()
 
-    def add_version(self, version_str: str, from_version_str: str | None = None):
+    def add_version(
+        self,
+        version_str: str,
+        from_version_str: str | None = None,
+        prefetch_cache: releases.ReleaseCache | None = None,
+    ):
         """Add a new Bitcoin Core version.
 
         Args:
             version_str: New version to create (e.g., "29.3")
             from_version_str: Optional source version to copy from. If not specified,
                               uses the active version with the same major, or latest.
+            prefetch_cache: If set, download and check all release artifacts into
+                            this cache before touching any directories.
         """
         version = Version(version_str)
 
@@ -135,6 +72,9 @@ class VersionManager:
             print(f"Error: Version {version} already exists", file=sys.stderr)
             sys.exit(1)
 
+        if prefetch_cache:
+            self._prefetch(version, prefetch_cache)
+
         # Determine source version
         if from_version_str:
             source_version = Version(from_version_str)
@@ -175,11 +115,10 @@ class VersionManager:
         self._update_dockerfile_version(
             target_dir / "Dockerfile", source_version.original, version.original
         )
-        self._update_dockerfile_version(
-            target_dir / "alpine" / "Dockerfile",
-            source_version.original,
-            version.original,
-        )
+        for dockerfile in sorted(target_dir.glob("*/Dockerfile")):
+            self._update_dockerfile_version(
+                dockerfile, source_version.original, version.original
+            )
 
         # Auto-deprecate old version if same major
         if auto_deprecate:
@@ -198,6 +137,27 @@ class VersionManager:
         print(f"  2. Test build: docker build {target_dir}")
         print(f"  3. Commit: git add -A && git commit -m 'Add v{version}'")
 
+    def _prefetch(self, version: Version, cache: releases.ReleaseCache):
+        """Fetch and check every release artifact, exiting on any failure."""
+        print(f"Prefetching {version} artifacts from {cache.host}")
+        start = time.monotonic()
+        try:
+            results = cache.fetch_release(version.original)
+        except (OSError, ValueError, urllib.error.URLError) as e:
+            print(f"Error: Prefetch failed: {e}", file=sys.stderr)
+            sys.exit(1)
+        for result in results:
+            print(f"  {result}")
+        print(f"  Total: {time.monotonic() - start:.1f}s")
+        print(f"  {cache.sums_status}")
+
+        failed = [r.name for r in results if not r.ok]
+        if failed:
+            print(
+                f"Error: Could not fetch/verify {', '.join(failed)}", file=sys.stderr
+            )
+            sys.exit(1)
+
     def _deprecate_version_internal(self, version: Version):
         """Internal method to deprecate a version (no README update, no user prompts)."""
         source_dir = self.repo_root / version.original
@@ -303,6 +263,17 @@ class VersionManager:
                 alpine_tags = f"`{v.original}-alpine`, `{major}-alpine`"
             alpine_link = f"[{v.original}/alpine/Dockerfile](https://github.com/willcl-ark/bitcoin-core-docker/blob/master/{v.original}/alpine/Dockerfile)"
             lines.append(f"- {alpine_tags} ({alpine_link})")
+
+            # Static line
+            if (self.repo_root / v.original / "static" / "Dockerfile").exists():
+                if v.is_rc:
+                    static_tags = f"`{v.original}-static`"
+                elif is_latest:
+                    static_tags = f"`{v.original}-static`, `{major}-static`, `static`"
+                else:
+                    static_tags = f"`{v.original}-static`, `{major}-static`"
+                static_link = f"[{v.original}/static/Dockerfile](https://github.com/willcl-ark/bitcoin-core-docker/blob/master/{v.original}/static/Dockerfile)"
+                lines.append(f"- {static_tags} ({static_link}) [**multi-platform**]")
             lines.append("")  # Blank line between versions
 
         new_tags = "\n".join(lines)
@@ -315,6 +286,49 @@ class VersionManager:
         self.readme_file.write_text(updated)
 
 
+def add_release_cache_arguments(parser: argparse.ArgumentParser):
+    """Add the options shared by commands that use the release cache."""
+    parser.add_argument(
+        "--host",
+        default=releases.DEFAULT_HOST,
+        help=f"Release host (default: {releases.DEFAULT_HOST})",
+    )
+    parser.add_argument(
+        "--compare-host",
+        action="append",
+        help="Mirror whose SHA256SUMS must match --host (repeatable, "
+        f"default: {', '.join(releases.DEFAULT_COMPARE_HOSTS)})",
+    )
+    parser.add_argument(
+        "--no-compare", action="store_true", help="Skip the mirror comparison"
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=Path,
+        help="Artifact cache directory (default: $BITCOIN_RELEASE_CACHE)",
+    )
+    parser.add_argument(
+        "--jobs", type=int, default=4, help="Concurrent downloads per release"
+    )
+    parser.add_argument(
+        "--min-good-sigs",
+        type=int,
+        default=0,
+        help="Require this many good gpg signatures on SHA256SUMS (default: 0, "
+        "unsigned; the Dockerfiles require 6)",
+    )
+
+
+def release_cache_from_args(args) -> releases.ReleaseCache:
+    """Build a ReleaseCache from add_release_cache_arguments options."""
+    compare_hosts = args.compare_host or releases.DEFAULT_COMPARE_HOSTS
+    if args.no_compare:
+        compare_hosts = ()
+    return releases.ReleaseCache(
+        args.cache_dir, args.host, compare_hosts, args.jobs, args.min_good_sigs
+    )
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Bitcoin Core Docker Version Manager",
@@ -331,6 +345,12 @@ def main():
         nargs="?",
         help="Source version to copy from (default: same major or latest)",
     )
+    add_parser.add_argument(
+        "--prefetch",
+        action="store_true",
+        help="Download and verify all release artifacts before adding",
+    )
+    add_release_cache_arguments(add_parser)
 
     # deprecate command
     dep_parser = subparsers.add_parser(
@@ -341,6 +361,18 @@ def main():
     # list command
     subparsers.add_parser("list", help="List active versions")
 
+    # watch command
+    watch_parser = subparsers.add_parser(
+        "watch", help="Poll for new releases and pre-fetch their artifacts"
+    )
+    add_release_cache_arguments(watch_parser)
+    watch_parser.add_argument(
+        "--interval", type=int, default=300, help="Seconds between polls"
+    )
+    watch_parser.add_argument(
+        "--once", action="store_true", help="Poll once and exit (for cron)"
+    )
+
     args = parser.parse_args()
 
     # Find repo root (directory containing .github)
@@ -352,11 +384,15 @@ def main():
     manager = VersionManager(repo_root)
 
     if args.command == "add":
-        manager.add_version(args.version, args.from_version)
+        cache = release_cache_from_args(args) if args.prefetch else None
+        manager.add_version(args.version, args.from_version, cache)
     elif args.command == "deprecate":
         manager.deprecate_version(args.version)
     elif args.command == "list":
         manager.list_versions()
+    elif args.command == "watch":
+        cache = release_cache_from_args(args)
+        releases.watch(cache, args.interval, args.once)
 
 
 if __name__ == "__main__":